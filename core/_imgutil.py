@@ -0,0 +1,20 @@
+"""Быстрые преобразования PIL <-> NumPy для модулей ядра."""
+
+from __future__ import annotations
+
+import numpy as np
+from PIL import Image
+
+
+def pil_to_np(image: Image.Image) -> np.ndarray:
+    """Возвращает RGB-пиксели как массив (H, W, 3) uint8 только для чтения."""
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    w, h = image.size
+    return np.frombuffer(image.tobytes(), dtype=np.uint8).reshape(h, w, 3)
+
+
+def np_to_pil(arr: np.ndarray) -> Image.Image:
+    """Собирает RGB-изображение из массива (H, W, 3) uint8."""
+    h, w = arr.shape[:2]
+    return Image.frombytes("RGB", (w, h), np.ascontiguousarray(arr, dtype=np.uint8).tobytes())
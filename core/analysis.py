@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from typing import Any, Dict, List, Sequence
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import os
 
 import numpy as np
 from PIL import Image, ImageFilter
@@ -9,8 +11,39 @@ from skimage.metrics import mean_squared_error as mse
 from skimage.metrics import peak_signal_noise_ratio as psnr
 from skimage.metrics import structural_similarity as ssim
 
-from .stego import decode_text_from_image, encode_text_into_image, max_message_bytes
-from .visual_analysis import compute_delta_map, compute_heatmap
+from ._imgutil import np_to_pil, pil_to_np
+from .stego import (
+    decode_payload,
+    decode_payload_from_image,
+    decode_text_from_image,
+    encode_payload_into_image,
+    encode_text_into_image,
+    max_message_bytes,
+    prepare_payload,
+)
+from .visual_analysis import build_analysis_preview, compute_delta_map, compute_heatmap
+
+
+def _resample_from_env(default: Image.Resampling) -> Image.Resampling:
+    name = os.environ.get("STEGO_RESAMPLE", "").strip().upper()
+    return Image.Resampling.__members__.get(name, default) if name else default
+
+
+# Фильтр атаки изменения размера; переопределяется STEGO_RESAMPLE=bicubic|bilinear|...
+RESAMPLE = _resample_from_env(Image.Resampling.LANCZOS)
+
+
+def warm_up_kernels() -> None:
+    """Прогревает Numba-ядра на крошечном изображении.
+
+    Вызовы идут через публичные функции, чтобы ядра специализировались на тех же
+    типах массивов (включая read-only), что и в работе; при ``cache=True``
+    повторный запуск берёт скомпилированный код с диска.
+    """
+    image = Image.new("RGB", (8, 8), (90, 120, 150))
+    encoded = encode_text_into_image(image, "warm-up", "", 1, "sequential")
+    decode_text_from_image(encoded, "", 1, "sequential")
+    build_analysis_preview(image, encoded, mode="heatmap")
 
 
 def compute_change_heatmap(original: Image.Image, modified: Image.Image) -> Image.Image:
@@ -24,36 +57,64 @@ def run_attack_suite(
     password: str,
     bits_per_channel: int,
     method: str,
+    resample: Optional[Image.Resampling] = None,
 ) -> List[Dict[str, Any]]:
+    resample = RESAMPLE if resample is None else resample
     suite = [
         ("baseline", "Без атаки", lambda img: img.copy()),
         ("jpeg_q35", "JPEG q=35 (с потерями)", lambda img: _jpeg_roundtrip(img, quality=35)),
-        ("resize_70", "Изменение размера 70% + восстановление", lambda img: _resize_restore(img, scale=0.7)),
+        ("resize_70", "Изменение размера 70% + восстановление", lambda img: _resize_restore(img, scale=0.7, resample=resample)),
         ("noise_12", "Шум 12%", lambda img: _add_noise(img, amount=0.12, amplitude=24, seed=123)),
         ("blur_1", "Гауссово размытие r=1", lambda img: img.filter(ImageFilter.GaussianBlur(radius=1.0))),
     ]
 
-    results: List[Dict[str, Any]] = []
-    for attack_id, attack_name, transform in suite:
-        transformed = transform(encoded_image.convert("RGB"))
-        ok = False
-        error = None
-        extracted = ""
-        try:
-            extracted = decode_text_from_image(transformed, password, bits_per_channel, method)
-            ok = extracted == expected_text
-        except Exception as exc:
-            error = str(exc)
-        results.append(
-            {
-                "id": attack_id,
-                "name": attack_name,
-                "success": bool(ok),
-                "error": error,
-                "preview_text": _safe_preview_text(extracted),
-            }
-        )
-    return results
+    source = encoded_image.convert("RGB")
+    # Атаки независимы, а Pillow/NumPy отпускают GIL в тяжёлых участках.
+    workers = max(1, min(len(suite), os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                _run_one_attack,
+                attack_id,
+                attack_name,
+                transform,
+                source,
+                expected_text,
+                password,
+                bits_per_channel,
+                method,
+            )
+            for attack_id, attack_name, transform in suite
+        ]
+        return [future.result() for future in futures]
+
+
+def _run_one_attack(
+    attack_id: str,
+    attack_name: str,
+    transform: Callable[[Image.Image], Image.Image],
+    source: Image.Image,
+    expected_text: str,
+    password: str,
+    bits_per_channel: int,
+    method: str,
+) -> Dict[str, Any]:
+    transformed = transform(source.copy())
+    ok = False
+    error = None
+    extracted = ""
+    try:
+        extracted = decode_text_from_image(transformed, password, bits_per_channel, method)
+        ok = extracted == expected_text
+    except Exception as exc:
+        error = str(exc)
+    return {
+        "id": attack_id,
+        "name": attack_name,
+        "success": bool(ok),
+        "error": error,
+        "preview_text": _safe_preview_text(extracted),
+    }
 
 
 def run_mode_benchmark(
@@ -62,9 +123,14 @@ def run_mode_benchmark(
     password: str,
     bits_options: Sequence[int] = (1, 2, 3),
     methods: Sequence[str] = ("sequential", "interleaved"),
+    fast_ssim: bool = True,
 ) -> List[Dict[str, Any]]:
     image = original_image.convert("RGB")
     payload_bytes = len(message_text.encode("utf-8"))
+    # Пароль и длина не зависят от режима: payload и массив оригинала готовим один раз.
+    payload = prepare_payload(message_text, password)
+    arr_o = pil_to_np(image)
+    luma_o = _luma(arr_o) if fast_ssim else None
     results: List[Dict[str, Any]] = []
     for method in methods:
         for bits in bits_options:
@@ -86,10 +152,13 @@ def run_mode_benchmark(
                 )
                 continue
             try:
-                encoded = encode_text_into_image(image, message_text, password, int(bits), method)
-                decoded = decode_text_from_image(encoded, password, int(bits), method)
-                arr_o = np.array(image)
-                arr_e = np.array(encoded)
+                encoded = encode_payload_into_image(image, payload, int(bits), method)
+                decoded = decode_payload(decode_payload_from_image(encoded, int(bits), method), password)
+                arr_e = pil_to_np(encoded)
+                if fast_ssim:
+                    ssim_value = ssim(luma_o, _luma(arr_e), data_range=255)
+                else:
+                    ssim_value = ssim(arr_o, arr_e, data_range=255, channel_axis=-1)
                 results.append(
                     {
                         "method": method,
@@ -98,7 +167,7 @@ def run_mode_benchmark(
                         "decode_ok": decoded == message_text,
                         "psnr_db": float(psnr(arr_o, arr_e, data_range=255)),
                         "mse": float(mse(arr_o, arr_e)),
-                        "ssim": float(ssim(arr_o, arr_e, multichannel=True, data_range=255, channel_axis=-1)),
+                        "ssim": float(ssim_value),
                         "capacity": int(capacity),
                         "usage_ratio": float(payload_bytes) / float(capacity) if capacity else None,
                         "error": None,
@@ -122,29 +191,39 @@ def run_mode_benchmark(
     return results
 
 
+def _luma(arr: np.ndarray) -> np.ndarray:
+    """Яркость BT.601: SSIM по одному каналу вместо трёх RGB-проходов."""
+    return (0.299 * arr[..., 0] + 0.587 * arr[..., 1] + 0.114 * arr[..., 2]).astype(np.float32)
+
+
 def _jpeg_roundtrip(image: Image.Image, quality: int) -> Image.Image:
     buf = BytesIO()
     image.convert("RGB").save(buf, format="JPEG", quality=int(quality), subsampling=2)
     buf.seek(0)
-    return Image.open(buf).convert("RGB")
+    decoded = Image.open(buf)
+    # Декодер сразу выдаёт RGB исходного размера, без промежуточного режима.
+    decoded.draft("RGB", decoded.size)
+    return decoded.convert("RGB")
 
 
-def _resize_restore(image: Image.Image, scale: float) -> Image.Image:
+def _resize_restore(image: Image.Image, scale: float, resample: Optional[Image.Resampling] = None) -> Image.Image:
+    resample = RESAMPLE if resample is None else resample
     w, h = image.size
     nw = max(8, int(w * scale))
     nh = max(8, int(h * scale))
-    tmp = image.resize((nw, nh), Image.Resampling.BICUBIC)
-    return tmp.resize((w, h), Image.Resampling.BICUBIC)
+    tmp = image.resize((nw, nh), resample)
+    return tmp.resize((w, h), resample)
 
 
 def _add_noise(image: Image.Image, amount: float, amplitude: int, seed: int) -> Image.Image:
-    arr = np.array(image.convert("RGB"), dtype=np.int16)
+    arr = pil_to_np(image).astype(np.int16)
     rng = np.random.default_rng(seed)
     noise = rng.integers(-amplitude, amplitude + 1, size=arr.shape, dtype=np.int16)
-    mask = rng.random((arr.shape[0], arr.shape[1], 1)) < float(amount)
-    out = np.where(mask, arr + noise, arr)
-    out = np.clip(out, 0, 255).astype(np.uint8)
-    return Image.fromarray(out, mode="RGB")
+    mask = rng.random(arr.shape[:2]) < float(amount)
+    # Порядок выборок RNG прежний: результат атаки при том же seed не меняется.
+    np.add(arr, noise, out=arr, where=mask[..., None])
+    np.clip(arr, 0, 255, out=arr)
+    return np_to_pil(arr.astype(np.uint8))
 
 
 def _safe_preview_text(text: str, limit: int = 90) -> str:
@@ -1,18 +1,21 @@
 from __future__ import annotations
 
-from io import BytesIO
+from io import BytesIO, StringIO
 from pathlib import Path
 from typing import Any, Dict, Mapping, Sequence
-import json
+import csv
 import zipfile
 
 from PIL import Image
 
 from .analysis import compute_change_heatmap
-from .report import render_report_text
+from .report import render_report_json_bytes, render_report_text
 
 
 FIXED_ZIP_DATETIME = (2020, 1, 1, 0, 0, 0)
+# Артефакты пишутся один раз: быстрый zlib важнее пары процентов размера.
+PNG_COMPRESS_LEVEL = 1
+ZIP_COMPRESS_LEVEL = 1
 
 
 def export_proof_pack(
@@ -22,6 +25,7 @@ def export_proof_pack(
     encoded_image: Image.Image,
     attacks: Sequence[Mapping[str, Any]] | None = None,
     extra_png_artifacts: Mapping[str, bytes] | None = None,
+    compress_level: int = PNG_COMPRESS_LEVEL,
 ) -> str:
     """Создает детерминированный ZIP-архив с ключевыми артефактами."""
     zip_path = str(zip_path)
@@ -43,12 +47,12 @@ def export_proof_pack(
             visual_artifacts[key] = arc_name
 
     heatmap = compute_change_heatmap(source_image, encoded_image)
-    report_json = json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True).encode("utf-8")
+    report_json = render_report_json_bytes(report)
     report_txt = render_report_text(report).encode("utf-8")
 
-    before_png = _pil_to_png_bytes(source_image)
-    after_png = _pil_to_png_bytes(encoded_image)
-    heatmap_png = _pil_to_png_bytes(heatmap)
+    before_png = _pil_to_png_bytes(source_image, compress_level)
+    after_png = _pil_to_png_bytes(encoded_image, compress_level)
+    heatmap_png = _pil_to_png_bytes(heatmap, compress_level)
     attacks_csv = _attacks_to_csv_bytes(attacks or [])
 
     files = [
@@ -63,7 +67,7 @@ def export_proof_pack(
         for arc_name, payload in sorted(extra_png_artifacts.items()):
             files.append((arc_name, payload))
 
-    with zipfile.ZipFile(zip_path, mode="w") as zf:
+    with zipfile.ZipFile(zip_path, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=ZIP_COMPRESS_LEVEL) as zf:
         for arc_name, payload in files:
             _writestr_deterministic(zf, arc_name, payload)
     return zip_path
@@ -71,33 +75,38 @@ def export_proof_pack(
 
 def _writestr_deterministic(zf: zipfile.ZipFile, arc_name: str, payload: bytes) -> None:
     info = zipfile.ZipInfo(filename=arc_name, date_time=FIXED_ZIP_DATETIME)
-    info.compress_type = zipfile.ZIP_DEFLATED
+    # PNG уже сжат zlib: повторный deflate только тратит CPU.
+    if arc_name.endswith(".png"):
+        info.compress_type = zipfile.ZIP_STORED
+        compresslevel = None
+    else:
+        info.compress_type = zipfile.ZIP_DEFLATED
+        compresslevel = ZIP_COMPRESS_LEVEL
     info.create_system = 3
     info.external_attr = 0o644 << 16
-    zf.writestr(info, payload)
+    zf.writestr(info, payload, compresslevel=compresslevel)
 
 
-def _pil_to_png_bytes(image: Image.Image) -> bytes:
+def _pil_to_png_bytes(image: Image.Image, compress_level: int = PNG_COMPRESS_LEVEL) -> bytes:
+    if image.mode != "RGB":
+        image = image.convert("RGB")
     buf = BytesIO()
-    image.convert("RGB").save(buf, format="PNG")
+    image.save(buf, format="PNG", compress_level=int(compress_level), optimize=False)
     return buf.getvalue()
 
 
 def _attacks_to_csv_bytes(attacks: Sequence[Mapping[str, Any]]) -> bytes:
-    # csv ожидает строковый буфер; собираем через list и кодируем UTF-8.
-    lines: list[str] = []
-    lines.append("attack_id,attack_name,success,error,preview_text")
-    for row in attacks:
-        attack_id = _csv_escape(str(row.get("id", "")))
-        name = _csv_escape(str(row.get("name", "")))
-        success = "1" if row.get("success") else "0"
-        error = _csv_escape(str(row.get("error") or ""))
-        preview = _csv_escape(str(row.get("preview_text") or ""))
-        lines.append(f"{attack_id},{name},{success},{error},{preview}")
-    return ("\n".join(lines) + "\n").encode("utf-8")
-
-
-def _csv_escape(value: str) -> str:
-    if any(ch in value for ch in [",", '"', "\n", "\r"]):
-        return '"' + value.replace('"', '""') + '"'
-    return value
+    buf = StringIO()
+    writer = csv.writer(buf, lineterminator="\n", quoting=csv.QUOTE_MINIMAL)
+    writer.writerow(["attack_id", "attack_name", "success", "error", "preview_text"])
+    writer.writerows(
+        [
+            str(row.get("id", "")),
+            str(row.get("name", "")),
+            "1" if row.get("success") else "0",
+            str(row.get("error") or ""),
+            str(row.get("preview_text") or ""),
+        ]
+        for row in attacks
+    )
+    return buf.getvalue().encode("utf-8")
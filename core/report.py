@@ -2,8 +2,14 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 from typing import Any, Dict, Mapping, Optional, Sequence
+import json
 import uuid
 
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency at runtime
+    orjson = None
+
 
 APP_NAME = "Стего Студия"
 APP_VERSION = "0.3.0"
@@ -102,6 +108,17 @@ def build_stegano_report(
     }
 
 
+def render_report_json_bytes(report: Mapping[str, Any]) -> bytes:
+    """JSON отчёта в UTF-8: ключи отсортированы, отступ 2 пробела."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(report, option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2)
+        except TypeError:
+            # orjson строже к типам (например, numpy-скаляры) — уходим в stdlib.
+            pass
+    return json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True).encode("utf-8")
+
+
 def render_report_text(report: Mapping[str, Any]) -> str:
     schema = report.get("schema", {})
     meta = report.get("meta", {})
@@ -233,6 +250,10 @@ def _normalize_chi_stats(stats: Mapping[str, Any]) -> Dict[str, Any]:
 def _round_or_none(value: Any, digits: int) -> Optional[float]:
     if value is None:
         return None
+    if type(value) is float:
+        # Обычный float округляется сразу, без повторного float(); подклассы вроде
+        # numpy.float64 и прочие типы проходят через приведение ниже.
+        return round(value, digits)
     try:
         return round(float(value), digits)
     except Exception:
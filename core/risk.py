@@ -5,26 +5,25 @@ from typing import Dict, Mapping, Tuple
 import numpy as np
 from PIL import Image
 
+from ._imgutil import pil_to_np
+
 
 def chi_square_lsb_test(img: Image.Image | None) -> Dict[str, float | int | bool]:
     if img is None:
         return {"chi2": 0.0, "zero_bits": 0, "one_bits": 0, "suspicious": False}
 
-    counts = {"0": 0, "1": 0}
-    pixels = np.array(img.convert("RGB"), dtype=np.uint8)
-    for channel in range(3):
-        lsb = pixels[:, :, channel] & 1
-        counts["0"] += int(np.sum(lsb == 0))
-        counts["1"] += int(np.sum(lsb == 1))
+    pixels = pil_to_np(img).reshape(-1)
+    # Плоскость LSB содержит только 0/1, поэтому её bool-вид считается count_nonzero без сумматора.
+    ones = int(np.count_nonzero(np.bitwise_and(pixels, 1).view(np.bool_)))
+    zeros = int(pixels.size - ones)
 
-    total = counts["0"] + counts["1"]
-    expected = max(1.0, total / 2.0)
-    chi2 = ((counts["0"] - expected) ** 2 / expected) + ((counts["1"] - expected) ** 2 / expected)
+    expected = max(1.0, (zeros + ones) / 2.0)
+    chi2 = ((zeros - expected) ** 2 / expected) + ((ones - expected) ** 2 / expected)
 
     return {
         "chi2": float(chi2),
-        "zero_bits": int(counts["0"]),
-        "one_bits": int(counts["1"]),
+        "zero_bits": zeros,
+        "one_bits": ones,
         "suspicious": bool(chi2 > 10.0),
     }
 
@@ -1,25 +1,42 @@
 from __future__ import annotations
 
-from typing import Iterable, Iterator, List, Sequence, Tuple
+from functools import lru_cache
+from typing import Dict, Sequence, Tuple
 
+import numpy as np
 from PIL import Image
 
+from ._imgutil import pil_to_np
+
+try:
+    from . import stego_numba  # type: ignore
+except Exception:  # pragma: no cover - optional dependency at runtime
+    stego_numba = None
+
 
 SUPPORTED_METHODS = {"sequential", "interleaved"}
 
 
 def xor_with_password(data: bytes, password: str) -> bytes:
-    if not password:
+    if not password or not data:
         return data
-    pw = password.encode("utf-8")
-    return bytes(b ^ pw[i % len(pw)] for i, b in enumerate(data))
+    pw = np.frombuffer(password.encode("utf-8"), dtype=np.uint8)
+    key = np.resize(pw, len(data))
+    return (np.frombuffer(data, dtype=np.uint8) ^ key).tobytes()
 
 
-def get_carrier_order(bits_per_channel: int, method: str) -> List[Tuple[int, int]]:
+@lru_cache(maxsize=8)
+def get_carrier_order(bits_per_channel: int, method: str) -> Tuple[Tuple[int, int], ...]:
     validate_bits_and_method(bits_per_channel, method)
     if method == "interleaved":
-        return [(channel, bit_idx) for bit_idx in range(bits_per_channel) for channel in range(3)]
-    return [(channel, bit_idx) for channel in range(3) for bit_idx in range(bits_per_channel)]
+        return tuple((channel, bit_idx) for bit_idx in range(bits_per_channel) for channel in range(3))
+    return tuple((channel, bit_idx) for channel in range(3) for bit_idx in range(bits_per_channel))
+
+
+def get_carrier_tables(bits_per_channel: int, method: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Индексы каналов и сдвиги битов для слотов пикселя (массивы только для чтения)."""
+    validate_bits_and_method(bits_per_channel, method)
+    return _CARRIER_TABLES[(bits_per_channel, method)]
 
 
 def validate_bits_and_method(bits_per_channel: int, method: str) -> None:
@@ -65,30 +82,14 @@ def encode_payload_into_image(
     if payload_bits > total_bits_capacity:
         raise ValueError(f"Сообщение слишком большое ({payload_bits} бит > {total_bits_capacity})")
 
-    bit_stream = _bytes_to_bits(payload)
-    out = image.copy()
-    pixels_in = image.load()
-    pixels_out = out.load()
-    w, h = image.size
-    carrier_order = get_carrier_order(bits_per_channel, method)
-
-    idx = 0
-    for y in range(h):
-        for x in range(w):
-            channels = list(pixels_in[x, y])
-            for channel_idx, bit_idx in carrier_order:
-                if idx >= len(bit_stream):
-                    break
-                bit = bit_stream[idx]
-                if bit:
-                    channels[channel_idx] |= (1 << bit_idx)
-                else:
-                    channels[channel_idx] &= ~(1 << bit_idx)
-                idx += 1
-            pixels_out[x, y] = tuple(channels)
-            if idx >= len(bit_stream):
-                return out
-    return out
+    arr = np.array(image, dtype=np.uint8)
+    flat = arr.reshape(-1, 3)
+    channels, shifts = get_carrier_tables(bits_per_channel, method)
+    if stego_numba is not None:
+        stego_numba.embed_payload(flat, np.frombuffer(payload, dtype=np.uint8), channels, shifts)
+    else:
+        _embed_payload_numpy(flat, payload, channels, shifts)
+    return Image.fromarray(arr, mode="RGB")
 
 
 def decode_payload_from_image(image: Image.Image, bits_per_channel: int, method: str) -> bytes:
@@ -96,24 +97,18 @@ def decode_payload_from_image(image: Image.Image, bits_per_channel: int, method:
     if image.mode != "RGB":
         image = image.convert("RGB")
 
-    bits_iter = _iter_bits_from_image(image, bits_per_channel, method)
-
-    header_bits = [next(bits_iter, None) for _ in range(32)]
-    if any(bit is None for bit in header_bits):
+    channels, shifts = get_carrier_tables(bits_per_channel, method)
+    total_bytes = image.size[0] * image.size[1] * channels.size // 8
+    if total_bytes < 4:
         raise ValueError("Нет заголовка")
-    msg_len = _bits_to_int(header_bits)
+    msg_len = int.from_bytes(_read_payload_bytes(image, channels, shifts, 4), "big")
 
     max_bytes = max_message_bytes(image.size, bits_per_channel)
     if msg_len > max_bytes:
         raise ValueError("Некорректная длина сообщения")
 
-    payload_bits_count = msg_len * 8
-    msg_bits = [next(bits_iter, None) for _ in range(payload_bits_count)]
-    if any(bit is None for bit in msg_bits):
-        raise ValueError("Неполное сообщение")
-
-    msg_bytes = _bits_to_bytes(msg_bits)
-    return msg_len.to_bytes(4, "big") + msg_bytes
+    # Читаются только пиксели, занятые заголовком и сообщением.
+    return _read_payload_bytes(image, channels, shifts, 4 + msg_len)
 
 
 def encode_text_into_image(
@@ -130,38 +125,50 @@ def decode_text_from_image(
     return decode_payload(payload, password)
 
 
-def _bytes_to_bits(data: bytes) -> List[int]:
-    bits: List[int] = []
-    for byte in data:
-        for shift in range(7, -1, -1):
-            bits.append((byte >> shift) & 1)
-    return bits
+def _build_carrier_tables(bits_per_channel: int, method: str) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.array(get_carrier_order(bits_per_channel, method), dtype=np.intp)
+    channels = np.ascontiguousarray(order[:, 0])
+    shifts = order[:, 1].astype(np.uint8)
+    channels.setflags(write=False)
+    shifts.setflags(write=False)
+    return channels, shifts
 
 
-def _bits_to_int(bits: Sequence[int]) -> int:
-    value = 0
-    for bit in bits:
-        value = (value << 1) | int(bit)
-    return value
+_CARRIER_TABLES: Dict[Tuple[int, str], Tuple[np.ndarray, np.ndarray]] = {
+    (bits, method): _build_carrier_tables(bits, method) for bits in (1, 2, 3) for method in sorted(SUPPORTED_METHODS)
+}
 
 
-def _bits_to_bytes(bits: Sequence[int]) -> bytes:
-    out = bytearray()
-    for start in range(0, len(bits), 8):
-        chunk = bits[start : start + 8]
-        if len(chunk) < 8:
-            break
-        out.append(_bits_to_int(chunk))
-    return bytes(out)
+def _embed_payload_numpy(flat: np.ndarray, payload: bytes, channels: np.ndarray, shifts: np.ndarray) -> None:
+    bit_stream = np.unpackbits(np.frombuffer(payload, dtype=np.uint8))
+    slots = channels.size
+    # Бит i потока попадает в пиксель i // slots, слот i % slots.
+    for slot in range(slots):
+        column = bit_stream[slot::slots]
+        if not column.size:
+            continue
+        plane = flat[: column.size, channels[slot]]
+        plane &= np.uint8(0xFF) ^ (np.uint8(1) << shifts[slot])
+        plane |= column << shifts[slot]
 
 
-def _iter_bits_from_image(image: Image.Image, bits_per_channel: int, method: str) -> Iterator[int]:
-    pixels = image.load()
+def _read_payload_bytes(image: Image.Image, channels: np.ndarray, shifts: np.ndarray, n_bytes: int) -> bytes:
+    n_pixels = -(-n_bytes * 8 // channels.size)
     w, h = image.size
-    carrier_order = get_carrier_order(bits_per_channel, method)
-    for y in range(h):
-        for x in range(w):
-            channels = pixels[x, y]
-            for channel_idx, bit_idx in carrier_order:
-                yield (channels[channel_idx] >> bit_idx) & 1
-
+    rows = -(-n_pixels // w)
+    if rows < h:
+        image = image.crop((0, 0, w, rows))
+    flat = pil_to_np(image).reshape(-1, 3)
+    if stego_numba is not None:
+        return stego_numba.extract_payload(flat, channels, shifts, n_bytes).tobytes()
+    return _extract_payload_numpy(flat, channels, shifts, n_bytes)
+
+
+def _extract_payload_numpy(flat: np.ndarray, channels: np.ndarray, shifts: np.ndarray, n_bytes: int) -> bytes:
+    slots = channels.size
+    flat = flat[: -(-n_bytes * 8 // slots)]
+    bits = np.empty((flat.shape[0], slots), dtype=np.uint8)
+    for slot in range(slots):
+        np.right_shift(flat[:, channels[slot]], shifts[slot], out=bits[:, slot])
+    bits &= 1
+    return np.packbits(bits.reshape(-1)[: n_bytes * 8]).tobytes()
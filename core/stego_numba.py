@@ -0,0 +1,67 @@
+"""Numba-ядра LSB-встраивания и извлечения.
+
+Модуль импортируется опционально из ``core.stego``: если ``numba`` не установлена,
+используется NumPy-реализация с тем же результатом. Пиксели передаются как
+C-непрерывный массив (N, 3) uint8.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+from numba import njit, prange
+
+# Слой потоков workqueue не допускает параллельных запусков ядер из разных
+# потоков (например, из пула атак), поэтому вход в ядра сериализуется.
+KERNEL_LOCK = threading.Lock()
+
+
+def embed_payload(flat: np.ndarray, payload: np.ndarray, channels: np.ndarray, shifts: np.ndarray) -> None:
+    """Записывает биты ``payload`` в пиксели ``flat`` (N x 3, uint8) на месте."""
+    if not flat.flags.c_contiguous:
+        raise ValueError("flat должен быть C-непрерывным массивом")
+    with KERNEL_LOCK:
+        _embed_kernel(flat, payload, channels, shifts)
+
+
+def extract_payload(flat: np.ndarray, channels: np.ndarray, shifts: np.ndarray, n_bytes: int) -> np.ndarray:
+    """Собирает первые ``n_bytes`` байт битового потока из пикселей ``flat``."""
+    flat = np.ascontiguousarray(flat)
+    with KERNEL_LOCK:
+        return _extract_kernel(flat, channels, shifts, n_bytes)
+
+
+@njit(parallel=True, cache=True)
+def _embed_kernel(flat: np.ndarray, payload: np.ndarray, channels: np.ndarray, shifts: np.ndarray) -> None:
+    slots = channels.shape[0]
+    n_bits = payload.shape[0] * 8
+    n_pixels = (n_bits + slots - 1) // slots
+    for p in prange(n_pixels):
+        base = p * slots
+        for s in range(slots):
+            i = base + s
+            if i >= n_bits:
+                break
+            bit = (payload[i >> 3] >> (7 - (i & 7))) & 1
+            ch = channels[s]
+            shift = shifts[s]
+            flat[p, ch] = (flat[p, ch] & (0xFF ^ (1 << shift))) | (bit << shift)
+
+
+@njit(parallel=True, cache=True)
+def _extract_kernel(flat: np.ndarray, channels: np.ndarray, shifts: np.ndarray, n_bytes: int) -> np.ndarray:
+    slots = channels.shape[0]
+    out = np.empty(n_bytes, dtype=np.uint8)
+    for j in prange(n_bytes):
+        p = (j * 8) // slots
+        s = j * 8 - p * slots
+        value = 0
+        for _ in range(8):
+            value = (value << 1) | ((flat[p, channels[s]] >> shifts[s]) & 1)
+            s += 1
+            if s == slots:
+                s = 0
+                p += 1
+        out[j] = value
+    return out
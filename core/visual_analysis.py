@@ -1,16 +1,31 @@
 from __future__ import annotations
 
+from concurrent.futures import CancelledError, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, Tuple
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+import os
+import threading
+import weakref
 
 import numpy as np
 from PIL import Image
 
+from ._imgutil import pil_to_np
+
 try:
     import cv2  # type: ignore
 except Exception:  # pragma: no cover - optional dependency at runtime
     cv2 = None
 
+try:
+    from . import visual_numba  # type: ignore
+except Exception:  # pragma: no cover - optional dependency at runtime
+    visual_numba = None
+
+
+_BITS8 = tuple(f"{value:08b}" for value in range(256))
+
 
 @dataclass(frozen=True)
 class VisualStats:
@@ -21,28 +36,117 @@ class VisualStats:
     threshold: int
 
 
-def _rgb_array(image: Image.Image) -> np.ndarray:
-    return np.array(image.convert("RGB"), dtype=np.uint8)
+# id(image) -> (слабая ссылка, ключ актуальности, массив). Image не хешируется,
+# поэтому вместо WeakKeyDictionary запись удаляется колбэком слабой ссылки.
+_ARRAY_CACHE: Dict[int, Tuple["weakref.ref[Image.Image]", Tuple[Any, ...], np.ndarray]] = {}
+
+
+def rgb_array(image: Image.Image) -> np.ndarray:
+    """RGB-массив изображения; повторные вызовы для того же объекта берут его из кэша.
+
+    Запись живёт, пока жив сам объект ``Image``, и сбрасывается при смене режима,
+    размера или внутреннего буфера. Правки на месте (``paste``/``putpixel``) не
+    отслеживаются: анализ получает неизменяемые после загрузки изображения.
+    """
+    image_id = id(image)
+    cached = _ARRAY_CACHE.get(image_id)
+    if cached is not None and cached[0]() is image and cached[1] == _array_cache_key(image):
+        return cached[2]
+    arr = pil_to_np(image)
+    # Ключ берётся после pil_to_np: ленивый Image.open к этому моменту загружен.
+    ref = weakref.ref(image, lambda _ref, image_id=image_id: _drop_cached_array(image_id, _ref))
+    _ARRAY_CACHE[image_id] = (ref, _array_cache_key(image), arr)
+    return arr
+
+
+def _drop_cached_array(image_id: int, ref: "weakref.ref[Image.Image]") -> None:
+    cached = _ARRAY_CACHE.get(image_id)
+    if cached is not None and cached[0] is ref:
+        _ARRAY_CACHE.pop(image_id, None)
+
+
+def _array_cache_key(image: Image.Image) -> Tuple[Any, ...]:
+    return image.mode, image.size, id(image.im)
+
+
+def _as_rgb(image: Image.Image) -> Image.Image:
+    return image if image.mode == "RGB" else image.convert("RGB")
 
 
 def compute_delta_map(original: Image.Image, modified: Image.Image, threshold: int = 0) -> np.ndarray:
-    orig = _rgb_array(original).astype(np.int16)
-    mod = _rgb_array(modified).astype(np.int16)
-    delta = np.abs(mod - orig).max(axis=2).astype(np.uint8)
+    return compute_delta_map_from_arrays(rgb_array(original), rgb_array(modified), threshold)
+
+
+def compute_delta_map_from_arrays(
+    orig: np.ndarray,
+    mod: np.ndarray,
+    threshold: int = 0,
+    scratch: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> np.ndarray:
+    """Карта дельт для уже подготовленных массивов (H, W, 3) uint8.
+
+    ``scratch`` — два рабочих буфера формы ``orig`` для NumPy-ветки; результат
+    всегда записывается в новый массив.
+    """
+    if orig.shape != mod.shape:
+        raise ValueError("Размеры изображений не совпадают")
     thr = max(0, min(int(threshold), 255))
+    if visual_numba is not None:
+        return visual_numba.delta_map(orig, mod, thr)
+    h = orig.shape[0]
+    workers = min(os.cpu_count() or 1, h)
+    if orig.shape[0] * orig.shape[1] < _PARALLEL_MIN_PIXELS or workers < 2:
+        return _delta_rows(orig, mod, thr, scratch)
+    # Без numba большие карты считаются горизонтальными полосами в потоках:
+    # ufunc NumPy отпускают GIL, полосы пишутся в общий выходной массив.
+    out = np.empty(orig.shape[:2], dtype=np.uint8)
+    bounds = [h * i // workers for i in range(workers + 1)]
+
+    def _fill(y0: int, y1: int) -> None:
+        band = (scratch[0][y0:y1], scratch[1][y0:y1]) if scratch is not None else None
+        out[y0:y1] = _delta_rows(orig[y0:y1], mod[y0:y1], thr, band)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(_fill, bounds[:-1], bounds[1:]))
+    return out
+
+
+# Меньше ~1 Мп накладные расходы на потоки не окупаются.
+_PARALLEL_MIN_PIXELS = 1 << 20
+
+
+def _delta_rows(
+    orig: np.ndarray, mod: np.ndarray, thr: int, scratch: Optional[Tuple[np.ndarray, np.ndarray]] = None
+) -> np.ndarray:
+    # |a - b| для uint8 без int16: max(a, b) - min(a, b) не переполняется.
+    if scratch is None:
+        diff = np.maximum(orig, mod)
+        diff -= np.minimum(orig, mod)
+    else:
+        diff = np.maximum(orig, mod, out=scratch[0])
+        diff -= np.minimum(orig, mod, out=scratch[1])
+    delta = diff.max(axis=2)
     if thr > 0:
-        delta = np.where(delta >= thr, delta, 0).astype(np.uint8)
+        delta[delta < thr] = 0
     return delta
 
 
 def compute_visual_stats(delta_map: np.ndarray, threshold: int = 0) -> VisualStats:
     if delta_map.size == 0:
         return VisualStats(0.0, 0.0, 0, 0.0, int(threshold))
-    changed = delta_map > 0
+    if delta_map.dtype == np.uint8:
+        if visual_numba is not None and delta_map.ndim == 2:
+            hist = visual_numba.histogram_u8(delta_map)
+        else:
+            hist = np.bincount(delta_map.ravel(), minlength=256)
+        return _visual_stats_from_hist(hist, threshold)
+    # Прочие типы: один непрерывный плоский вид на все редукции.
+    flat = np.ascontiguousarray(delta_map).ravel()
+    changed = flat > 0
     changed_pct = float(np.mean(changed) * 100.0)
-    mean_delta = float(np.mean(delta_map))
-    max_delta = int(np.max(delta_map))
-    hotspot_score = float(np.percentile(delta_map.astype(np.float32), 95)) if changed.any() else 0.0
+    mean_delta = float(np.mean(flat))
+    max_delta = int(np.max(flat))
+    hotspot_score = float(np.percentile(flat.astype(np.float32), 95)) if changed.any() else 0.0
     return VisualStats(
         changed_pct=changed_pct,
         mean_delta=mean_delta,
@@ -52,49 +156,114 @@ def compute_visual_stats(delta_map: np.ndarray, threshold: int = 0) -> VisualSta
     )
 
 
+def _visual_stats_from_hist(hist: np.ndarray, threshold: int) -> VisualStats:
+    # Все показатели карты uint8 выводятся из 256-корзинной гистограммы без сортировки.
+    total = int(hist.sum())
+    changed = total - int(hist[0])
+    nonzero = np.flatnonzero(hist)
+    return VisualStats(
+        changed_pct=changed / total * 100.0,
+        mean_delta=float(np.dot(hist, np.arange(256, dtype=np.int64))) / total,
+        max_delta=int(nonzero[-1]),
+        hotspot_score=_hist_percentile(hist, 95.0) if changed else 0.0,
+        threshold=int(threshold),
+    )
+
+
+def _hist_percentile(hist: np.ndarray, q: float) -> float:
+    """Процентиль с линейной интерполяцией, как ``np.percentile``, по гистограмме."""
+    cum = np.cumsum(hist)
+    pos = (int(cum[-1]) - 1) * q / 100.0
+    lo = int(np.floor(pos))
+    hi = min(lo + 1, int(cum[-1]) - 1)
+    v_lo = int(np.searchsorted(cum, lo, side="right"))
+    v_hi = int(np.searchsorted(cum, hi, side="right"))
+    return float(v_lo + (v_hi - v_lo) * (pos - lo))
+
+
 def compute_heatmap(delta_map: np.ndarray, colormap: str = "turbo") -> np.ndarray:
     if delta_map.ndim != 2:
         raise ValueError("delta_map должен быть двумерной картой")
+    if colormap == "turbo" and visual_numba is not None and delta_map.dtype == np.uint8:
+        return visual_numba.heatmap_u8(delta_map, _TURBO_LUT)
     normalized = _normalize_uint8(delta_map)
+    if colormap == "turbo":
+        return _apply_palette(normalized, _TURBO_LUT)
     if cv2 is not None:
-        cmap = getattr(cv2, "COLORMAP_TURBO", cv2.COLORMAP_JET) if colormap == "turbo" else cv2.COLORMAP_JET
-        bgr = cv2.applyColorMap(normalized, cmap)
-        rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
-        return rgb.astype(np.uint8)
+        bgr = cv2.applyColorMap(normalized, cv2.COLORMAP_JET)
+        return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
     return _fallback_heatmap(normalized)
 
 
-def compute_hotspot_grid(delta_map: np.ndarray, rows: int = 12, cols: int = 12) -> np.ndarray:
+_HOTSPOT_ROWS = 12
+_HOTSPOT_COLS = 12
+
+
+def compute_hotspot_grid(
+    delta_map: np.ndarray, rows: int = _HOTSPOT_ROWS, cols: int = _HOTSPOT_COLS
+) -> np.ndarray:
     if delta_map.ndim != 2:
         raise ValueError("delta_map должен быть двумерной картой")
     h, w = delta_map.shape
     rows = max(1, int(rows))
     cols = max(1, int(cols))
+    if delta_map.size == 0:
+        return np.zeros((rows, cols), dtype=np.float32)
+    row_starts, col_starts, areas, filled = _hotspot_layout(h, w, rows, cols)
+    # Сначала узкие полосы по столбцам вдоль непрерывной оси (uint32 хватает на
+    # строку тайла), затем короткая свёртка (H, cols) по строкам. Таблица
+    # префиксных сумм здесь проигрывает: она пишет H x W int64 ради 144 тайлов.
+    # Целые карты суммируются точно в целых аккумуляторах, прочие (float) — во float64,
+    # иначе дробные дельты отбрасывались бы при приведении к целому.
+    if delta_map.dtype == np.uint8 or delta_map.dtype == np.bool_:
+        strip_dtype, tile_dtype = np.uint32, np.int64
+    elif np.issubdtype(delta_map.dtype, np.integer):
+        strip_dtype = tile_dtype = np.int64
+    else:
+        strip_dtype = tile_dtype = np.float64
+    col_sums = np.add.reduceat(delta_map, col_starts, axis=1, dtype=strip_dtype)
+    tile_sums = np.add.reduceat(col_sums, row_starts, axis=0, dtype=tile_dtype)
     grid = np.zeros((rows, cols), dtype=np.float32)
-    for r in range(rows):
-        y0 = int(round(r * h / rows))
-        y1 = int(round((r + 1) * h / rows))
-        for c in range(cols):
-            x0 = int(round(c * w / cols))
-            x1 = int(round((c + 1) * w / cols))
-            tile = delta_map[y0:y1, x0:x1]
-            grid[r, c] = float(tile.mean()) if tile.size else 0.0
+    np.divide(tile_sums, areas, out=grid, where=filled, casting="unsafe")
     max_val = float(grid.max()) if grid.size else 0.0
     if max_val > 0:
         grid /= max_val
     return grid
 
 
-def probe_pixel(original: Image.Image, modified: Image.Image, x: int, y: int) -> Dict[str, Any]:
-    orig = _rgb_array(original)
-    mod = _rgb_array(modified)
+@lru_cache(maxsize=8)
+def _hotspot_layout(h: int, w: int, rows: int, cols: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Начала полос, площади тайлов и маска непустых тайлов для сетки rows x cols."""
+    ys = np.round(np.arange(rows + 1) * h / rows).astype(np.intp)
+    xs = np.round(np.arange(cols + 1) * w / cols).astype(np.intp)
+    # reduceat для пустого отрезка возвращает элемент, а не 0: такие тайлы обнуляются по площади.
+    row_starts = np.minimum(ys[:-1], h - 1)
+    col_starts = np.minimum(xs[:-1], w - 1)
+    areas = np.outer(np.diff(ys), np.diff(xs))
+    filled = areas > 0
+    for arr in (row_starts, col_starts, areas, filled):
+        arr.setflags(write=False)
+    return row_starts, col_starts, areas, filled
+
+
+def probe_pixel(
+    original: Image.Image | np.ndarray, modified: Image.Image | np.ndarray, x: int, y: int
+) -> Dict[str, Any]:
+    """Сведения о пикселе; готовые массивы (H, W, 3) uint8 берутся как есть."""
+    orig = original if isinstance(original, np.ndarray) else rgb_array(original)
+    mod = modified if isinstance(modified, np.ndarray) else rgb_array(modified)
+    return probe_pixel_from_arrays(orig, mod, x, y)
+
+
+def probe_pixel_from_arrays(orig: np.ndarray, mod: np.ndarray, x: int, y: int) -> Dict[str, Any]:
+    """``probe_pixel`` для массивов (H, W, 3) uint8 без повторной конвертации PIL."""
     h, w = orig.shape[:2]
     if w == 0 or h == 0:
         raise ValueError("Пустое изображение")
     px = max(0, min(int(x), w - 1))
     py = max(0, min(int(y), h - 1))
-    before = tuple(int(v) for v in orig[py, px])
-    after = tuple(int(v) for v in mod[py, px])
+    before = tuple(orig[py, px].tolist())
+    after = tuple(mod[py, px].tolist())
     delta = tuple(abs(a - b) for a, b in zip(before, after))
     max_delta = max(delta)
     intensity = int(round((max_delta / 255.0) * 100.0))
@@ -106,8 +275,8 @@ def probe_pixel(original: Image.Image, modified: Image.Image, x: int, y: int) ->
                 "before": int(b),
                 "after": int(a),
                 "delta": int(a - b),
-                "before_bits": f"{b:08b}",
-                "after_bits": f"{a:08b}",
+                "before_bits": _BITS8[b],
+                "after_bits": _BITS8[a],
                 "before_lsb": int(b & 1),
                 "after_lsb": int(a & 1),
             }
@@ -131,54 +300,162 @@ def build_analysis_preview(
     threshold: int = 0,
     split_ratio: float = 0.5,
     amplify: int = 20,
+    should_continue: Optional[Callable[[], bool]] = None,
 ) -> Tuple[Image.Image, np.ndarray, VisualStats, np.ndarray]:
-    orig = original.convert("RGB")
-    mod = modified.convert("RGB")
-    delta_map = compute_delta_map(orig, mod, threshold=threshold)
-    stats = compute_visual_stats(delta_map, threshold=threshold)
-    hotspot = compute_hotspot_grid(delta_map)
-
-    if mode == "heatmap":
-        preview = Image.fromarray(compute_heatmap(delta_map), mode="RGB")
-    elif mode == "amplify20":
-        preview = _build_amplified_delta(delta_map, amplify=max(1, int(amplify)))
-    elif mode == "blend":
-        ratio = max(0.0, min(1.0, float(split_ratio)))
-        preview = Image.blend(orig, mod, ratio)
-    else:
-        preview = _build_split_preview(orig, mod, split_ratio)
-    return preview, delta_map, stats, hotspot
+    """Строит превью, карту дельт, статистику и сетку горячих зон.
+
+    ``should_continue`` опрашивается между этапами; если он вернул ``False``,
+    построение прерывается исключением ``concurrent.futures.CancelledError``.
+    """
+    preview, delta_map, stats, hotspot = _thread_analyzer().run(
+        original, modified, mode, threshold, split_ratio, amplify, should_continue
+    )
+    return Image.fromarray(preview, mode="RGB"), delta_map, stats, hotspot
+
+
+def build_analysis_preview_array(
+    original: Image.Image,
+    modified: Image.Image,
+    mode: str,
+    threshold: int = 0,
+    split_ratio: float = 0.5,
+    amplify: int = 20,
+    should_continue: Optional[Callable[[], bool]] = None,
+) -> Tuple[np.ndarray, np.ndarray, VisualStats, np.ndarray]:
+    """Как ``build_analysis_preview``, но превью — C-непрерывный массив (H, W, 3) uint8.
+
+    Такой массив UI оборачивает в QImage RGB888 без промежуточного ``Image``.
+    """
+    return _thread_analyzer().run(original, modified, mode, threshold, split_ratio, amplify, should_continue)
+
 
+class VisualAnalyzer:
+    """Построитель превью анализа с рабочими буферами, живущими между вызовами.
+
+    Буферы нужны только NumPy-ветке карты дельт и пересоздаются при смене размера.
+    Карта, статистика и превью каждый раз новые: UI кэширует их по параметрам.
+    Экземпляр не потокобезопасен — ``build_analysis_preview`` держит по одному на поток.
+    """
+
+    def __init__(self) -> None:
+        self._scratch: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def run(
+        self,
+        original: Image.Image,
+        modified: Image.Image,
+        mode: str,
+        threshold: int = 0,
+        split_ratio: float = 0.5,
+        amplify: int = 20,
+        should_continue: Optional[Callable[[], bool]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, VisualStats, np.ndarray]:
+        def checkpoint() -> None:
+            if should_continue is not None and not should_continue():
+                raise CancelledError()
+
+        checkpoint()
+        orig = _as_rgb(original)
+        mod = _as_rgb(modified)
+        orig_arr = rgb_array(orig)
+        mod_arr = rgb_array(mod)
+        delta_map = compute_delta_map_from_arrays(
+            orig_arr, mod_arr, threshold=threshold, scratch=self._scratch_for(orig_arr.shape)
+        )
+        checkpoint()
+        if delta_map.any():
+            stats = compute_visual_stats(delta_map, threshold=threshold)
+            hotspot = compute_hotspot_grid(delta_map)
+        else:
+            # Одинаковые изображения или всё отсечено порогом: статистика заранее нулевая.
+            stats = VisualStats(0.0, 0.0, 0, 0.0, int(threshold))
+            hotspot = np.zeros((_HOTSPOT_ROWS, _HOTSPOT_COLS), dtype=np.float32)
+        checkpoint()
 
-def _build_split_preview(original: Image.Image, modified: Image.Image, split_ratio: float) -> Image.Image:
+        if mode == "heatmap":
+            preview = compute_heatmap(delta_map)
+        elif mode == "amplify20":
+            preview = _build_amplified_delta(delta_map, amplify=max(1, int(amplify)))
+        elif mode == "blend":
+            ratio = max(0.0, min(1.0, float(split_ratio)))
+            preview = np.asarray(Image.blend(orig, mod, ratio))
+        else:
+            preview = _build_split_preview(orig_arr, mod_arr, split_ratio)
+        return preview, delta_map, stats, hotspot
+
+    def _scratch_for(self, shape: Tuple[int, ...]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        if visual_numba is not None:
+            return None
+        if self._scratch is None or self._scratch[0].shape != shape:
+            self._scratch = (np.empty(shape, dtype=np.uint8), np.empty(shape, dtype=np.uint8))
+        return self._scratch
+
+
+_ANALYZERS = threading.local()
+
+
+def _thread_analyzer() -> VisualAnalyzer:
+    analyzer = getattr(_ANALYZERS, "analyzer", None)
+    if analyzer is None:
+        analyzer = _ANALYZERS.analyzer = VisualAnalyzer()
+    return analyzer
+
+
+def _build_split_preview(orig: np.ndarray, mod: np.ndarray, split_ratio: float) -> np.ndarray:
     ratio = max(0.0, min(1.0, float(split_ratio)))
-    split_x = int(original.width * ratio)
-    out = modified.copy()
-    if split_x > 0:
-        out.paste(original.crop((0, 0, split_x, original.height)), (0, 0))
-    if 0 < split_x < out.width:
-        line_w = max(2, out.width // 420)
-        arr = np.array(out, dtype=np.uint8)
-        x0 = max(1, min(out.width - 2, split_x))
-        arr[:, max(0, x0 - 1 - line_w // 2):min(out.width, x0 + 1 + line_w // 2), :] = np.array([8, 22, 35], dtype=np.uint8)
-        arr[:, max(0, x0 - line_w // 2):min(out.width, x0 + line_w // 2 + 1), :] = np.array([255, 209, 102], dtype=np.uint8)
-        out = Image.fromarray(arr, mode="RGB")
+    width = orig.shape[1]
+    split_x = int(width * ratio)
+    out = np.empty_like(mod)
+    out[:, :split_x] = orig[:, :split_x]
+    out[:, split_x:] = mod[:, split_x:]
+    if 0 < split_x < width:
+        line_w = max(2, width // 420)
+        x0 = max(1, min(width - 2, split_x))
+        out[:, max(0, x0 - 1 - line_w // 2):min(width, x0 + 1 + line_w // 2)] = (8, 22, 35)
+        out[:, max(0, x0 - line_w // 2):min(width, x0 + line_w // 2 + 1)] = (255, 209, 102)
     return out
 
 
-def _build_amplified_delta(delta_map: np.ndarray, amplify: int = 20) -> Image.Image:
-    amplified = np.clip(delta_map.astype(np.float32) * float(amplify), 0.0, 255.0)
-    max_amp = float(amplified.max()) if amplified.size else 0.0
+def _build_amplified_delta(delta_map: np.ndarray, amplify: int = 20) -> np.ndarray:
+    # Цвет зависит только от значения дельты (0..255) и максимума карты:
+    # палитра считается по 256 уровням, а карта раскрашивается одним gather.
+    levels = np.arange(256, dtype=np.float32)
+    amplified = np.clip(levels * float(amplify), 0.0, 255.0)
+    max_amp = float(amplified[int(delta_map.max())]) if delta_map.size else 0.0
     scaled = (amplified / max_amp * 255.0) if max_amp > 0 else amplified
-    mag = scaled.astype(np.float32) / 255.0
-    r = np.clip((mag ** 0.7) * 255.0, 0.0, 255.0).astype(np.uint8)
-    g = np.clip((mag ** 1.0) * 210.0 + 6.0, 0.0, 255.0).astype(np.uint8)
-    b = np.clip((mag ** 1.6) * 70.0 + 26.0, 0.0, 255.0).astype(np.uint8)
-    rgb = np.stack([r, g, b], axis=2)
-    return Image.fromarray(rgb, mode="RGB")
+    palette = amplify_palette(scaled.astype(np.float32) / 255.0)
+    return _apply_palette(delta_map, palette)
+
+
+def amplify_palette(mag: np.ndarray) -> np.ndarray:
+    """Цвета режима усиления для нормированных уровней ``mag`` в [0, 1]: массив (N, 3) uint8."""
+    # Небольшой базовый синий фон убирает "полностью чёрный" вид
+    # и делает режим более читабельным для глаз.
+    palette = np.empty((mag.shape[0], 3), dtype=np.uint8)
+    palette[:, 0] = np.clip((mag ** 0.7) * 255.0, 0.0, 255.0)
+    palette[:, 1] = np.clip((mag ** 1.0) * 210.0 + 6.0, 0.0, 255.0)
+    palette[:, 2] = np.clip((mag ** 1.6) * 70.0 + 26.0, 0.0, 255.0)
+    return palette
+
+
+def _apply_palette(values: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    """``palette[values]`` для карты uint8; numba-ядро или ``np.take`` вместо fancy-индексации."""
+    if visual_numba is not None and values.ndim == 2:
+        return visual_numba.palette_u8(values, palette)
+    # take по оси 0 копирует строки палитры в несколько раз быстрее, чем palette[values].
+    return np.take(palette, values, axis=0)
 
 
 def _normalize_uint8(delta_map: np.ndarray) -> np.ndarray:
+    if delta_map.dtype == np.uint8:
+        # Целочисленно v * 255 // max: для uint8 совпадает с float32-веткой бит в бит.
+        max_u8 = int(delta_map.max()) if delta_map.size else 0
+        if max_u8 <= 0:
+            return np.zeros_like(delta_map)
+        scaled = delta_map.astype(np.uint16)
+        scaled *= 255
+        scaled //= max_u8
+        return scaled.astype(np.uint8)
     arr = delta_map.astype(np.float32)
     max_val = float(arr.max()) if arr.size else 0.0
     if max_val <= 0:
@@ -187,10 +464,39 @@ def _normalize_uint8(delta_map: np.ndarray) -> np.ndarray:
     return out.astype(np.uint8)
 
 
-def _fallback_heatmap(normalized: np.ndarray) -> np.ndarray:
-    norm = normalized.astype(np.float32) / 255.0
+def _build_fallback_lut() -> np.ndarray:
+    norm = np.arange(256, dtype=np.float32) / 255.0
     r = np.clip((norm - 0.28) * 2.3, 0.0, 1.0)
     g = np.clip(1.0 - np.abs(norm - 0.55) * 2.0, 0.0, 1.0)
     b = np.clip(1.0 - norm * 1.15, 0.12, 1.0)
-    rgb = np.stack([r, g, b], axis=2)
+    rgb = np.stack([r, g, b], axis=1)
     return (rgb * 255.0).astype(np.uint8)
+
+
+_FALLBACK_LUT = _build_fallback_lut()
+
+
+def _fallback_heatmap(normalized: np.ndarray) -> np.ndarray:
+    return _apply_palette(normalized, _FALLBACK_LUT)
+
+
+# Палитра Turbo (Google, 2019) в RGB, те же 256 цветов, что у cv2.COLORMAP_TURBO.
+_TURBO_LUT_HEX = (
+    "30123b32154333184a341b51351e5836215f37246638276d392a733a2d793b2f803c32863d358b3e38913f3b973f3e9c"
+    "4040a24143a74146ac4249b1424bb5434eba4451bf4454c34456c74559cb455ccf455ed34661d64664da4666dd4669e0"
+    "466be3476ee64771e94773eb4776ee4778f0477bf2467df44680f64682f84685fa4687fb458afc458cfd448ffe4391fe"
+    "4294ff4196ff4099ff3e9bfe3d9efe3ba0fd3aa3fc38a5fb37a8fa35abf833adf731aff52fb2f42eb4f22cb7f02ab9ee"
+    "28bceb27bee925c0e723c3e422c5e220c7df1fc9dd1ecbda1ccdd81bd0d51ad2d21ad4d019d5cd18d7ca18d9c818dbc5"
+    "18ddc218dec018e0bd19e2bb19e3b91ae4b61ce6b41de7b21fe9af20eaac22ebaa25eca727eea42aefa12cf09e2ff19b"
+    "32f29835f39438f4913cf58e3ff68a43f78746f8844af8804ef97d52fa7a55fa7659fb735dfc6f61fc6c65fd6969fd66"
+    "6dfe6271fe5f75fe5c79fe597dff5680ff5384ff5188ff4e8bff4b8fff4992ff4796fe4499fe429cfe409ffd3fa1fd3d"
+    "a4fc3ca7fc3aa9fb39acfb38affa37b1f936b4f836b7f735b9f635bcf534bef434c1f334c3f134c6f034c8ef34cbed34"
+    "cdec34d0ea34d2e935d4e735d7e535d9e436dbe236dde037dfdf37e1dd37e3db38e5d938e7d739e9d539ebd339ecd13a"
+    "eecf3aefcd3af1cb3af2c93af4c73af5c53af6c33af7c13af8be39f9bc39faba39fbb838fbb637fcb336fcb136fdae35"
+    "fdac34fea933fea732fea431fea130fe9e2ffe9b2dfe992cfe962bfe932afe9029fd8d27fd8a26fc8725fc8423fb8122"
+    "fb7e21fa7b1ff9781ef9751df8721cf76f1af66c19f56918f46617f36315f26014f15d13f05b12ef5811ed5510ec530f"
+    "eb500eea4e0de84b0ce7490ce5470be4450ae2430ae14109df3f08dd3d08dc3b07da3907d83706d63506d43305d23105"
+    "d02f05ce2d04cc2b04ca2a04c82803c52603c32503c12302be2102bc2002b91e02b71d02b41b01b21a01af1801ac1701"
+    "a91601a71401a41301a112019e10019b0f01980e01950d01920b018e0a018b09028808028507028106027e05027a0403"
+)
+_TURBO_LUT = np.frombuffer(bytes.fromhex("".join(_TURBO_LUT_HEX)), dtype=np.uint8).reshape(256, 3)
@@ -0,0 +1,116 @@
+"""Numba-ядра визуальной аналитики.
+
+Модуль импортируется опционально из ``core.visual_analysis``: без ``numba``
+используются эквивалентные NumPy-выражения. Обёртки приводят входы к C-порядку,
+поэтому ядра специализируются только на непрерывной раскладке и векторизуются
+по последней оси.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from numba import njit, prange
+
+from .stego_numba import KERNEL_LOCK
+
+
+def delta_map(orig: np.ndarray, mod: np.ndarray, threshold: int) -> np.ndarray:
+    """Максимальная по каналам |mod - orig| для двух массивов (H, W, 3) uint8."""
+    orig = np.ascontiguousarray(orig)
+    mod = np.ascontiguousarray(mod)
+    out = np.empty(orig.shape[:2], dtype=np.uint8)
+    with KERNEL_LOCK:
+        _delta_map_kernel(orig, mod, threshold, out)
+    return out
+
+
+def histogram_u8(delta: np.ndarray) -> np.ndarray:
+    """Гистограмма (256,) int64 значений карты (H, W) uint8 за один проход."""
+    delta = np.ascontiguousarray(delta)
+    n_chunks = max(1, min(delta.shape[0], 64))
+    with KERNEL_LOCK:
+        partial = _histogram_kernel(delta, n_chunks)
+    return partial.sum(axis=(0, 1))
+
+
+def heatmap_u8(delta: np.ndarray, lut: np.ndarray) -> np.ndarray:
+    """Нормализация карты (H, W) uint8 к 0..255 и раскраска палитрой (256, 3) за одно ядро."""
+    delta = np.ascontiguousarray(delta)
+    out = np.empty(delta.shape + (3,), dtype=np.uint8)
+    with KERNEL_LOCK:
+        _heatmap_kernel(delta, np.ascontiguousarray(lut), out)
+    return out
+
+
+def palette_u8(delta: np.ndarray, lut: np.ndarray) -> np.ndarray:
+    """Раскраска карты (H, W) uint8 палитрой (256, 3) без промежуточных индексов."""
+    delta = np.ascontiguousarray(delta)
+    out = np.empty(delta.shape + (3,), dtype=np.uint8)
+    with KERNEL_LOCK:
+        _palette_kernel(delta, np.ascontiguousarray(lut), out)
+    return out
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _delta_map_kernel(orig: np.ndarray, mod: np.ndarray, threshold: int, out: np.ndarray) -> None:
+    h, w = out.shape
+    for y in prange(h):
+        for x in range(w):
+            best = 0
+            for c in range(3):
+                d = abs(np.int32(mod[y, x, c]) - np.int32(orig[y, x, c]))
+                if d > best:
+                    best = d
+            out[y, x] = best if best >= threshold else 0
+
+
+@njit(parallel=True, cache=True)
+def _histogram_kernel(delta: np.ndarray, n_chunks: int) -> np.ndarray:
+    # Карта стего-дельт почти вся из нулей: соседние пиксели бьют в одну корзину,
+    # и каждый инкремент ждёт предыдущий. Четыре подгистограммы на полосу
+    # разрывают эту цепочку зависимостей.
+    h, w = delta.shape
+    partial = np.zeros((n_chunks, 4, 256), dtype=np.int64)
+    for k in prange(n_chunks):
+        for y in range(k * h // n_chunks, (k + 1) * h // n_chunks):
+            x = 0
+            while x + 4 <= w:
+                partial[k, 0, delta[y, x]] += 1
+                partial[k, 1, delta[y, x + 1]] += 1
+                partial[k, 2, delta[y, x + 2]] += 1
+                partial[k, 3, delta[y, x + 3]] += 1
+                x += 4
+            while x < w:
+                partial[k, 0, delta[y, x]] += 1
+                x += 1
+    return partial
+
+
+@njit(parallel=True, cache=True)
+def _heatmap_kernel(delta: np.ndarray, lut: np.ndarray, out: np.ndarray) -> None:
+    h, w = delta.shape
+    row_max = np.zeros(h, dtype=np.int32)
+    for y in prange(h):
+        best = 0
+        for x in range(w):
+            if delta[y, x] > best:
+                best = delta[y, x]
+        row_max[y] = best
+    max_val = row_max.max() if h > 0 else 0
+    for y in prange(h):
+        for x in range(w):
+            idx = np.int32(delta[y, x]) * 255 // max_val if max_val > 0 else 0
+            out[y, x, 0] = lut[idx, 0]
+            out[y, x, 1] = lut[idx, 1]
+            out[y, x, 2] = lut[idx, 2]
+
+
+@njit(parallel=True, cache=True)
+def _palette_kernel(delta: np.ndarray, lut: np.ndarray, out: np.ndarray) -> None:
+    h, w = delta.shape
+    for y in prange(h):
+        for x in range(w):
+            v = delta[y, x]
+            out[y, x, 0] = lut[v, 0]
+            out[y, x, 1] = lut[v, 1]
+            out[y, x, 2] = lut[v, 2]
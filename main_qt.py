@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import sys
+import threading
 
+from PySide6.QtGui import QPixmapCache
 from PySide6.QtWidgets import QApplication
 
+from core.analysis import warm_up_kernels
 from ui_qt.main_window import MainWindow
 from ui_qt.theme import build_stylesheet
 
@@ -12,9 +15,13 @@ def main() -> int:
     app = QApplication(sys.argv)
     app.setApplicationName("Стего Студия")
     app.setStyleSheet(build_stylesheet("dark"))
+    # Лимит в КБ: несколько полноразмерных кадров (оригинал, стего, превью) помещаются целиком.
+    QPixmapCache.setCacheLimit(65536)
 
     win = MainWindow()
     win.show()
+    # JIT-компиляция ядер в фоне: первый анализ не ждёт её в потоке интерфейса.
+    threading.Thread(target=warm_up_kernels, name="kernel-warmup", daemon=True).start()
     return app.exec()
 
 
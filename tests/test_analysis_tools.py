@@ -40,6 +40,7 @@ class AnalysisToolsTests(unittest.TestCase):
             self.password,
             self.bits,
             self.method,
+            resample=Image.Resampling.BICUBIC,
         )
         self.assertGreaterEqual(len(rows), 5)
         names = {row["id"] for row in rows}
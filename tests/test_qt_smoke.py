@@ -1,5 +1,6 @@
 import os
 import unittest
+from unittest import mock
 
 import numpy as np
 from PIL import Image
@@ -60,6 +61,10 @@ class QtSmokeTests(unittest.TestCase):
             self.skipTest("PySide6 недоступен в окружении тестов")
             return
 
+        from core.analysis import warm_up_kernels
+
+        # Холодная JIT-компиляция не должна съедать время ожидания фонового анализа.
+        warm_up_kernels()
         app = QApplication.instance() or QApplication([])
         win = MainWindow()
         arr = np.zeros((64, 64, 3), dtype=np.uint8)
@@ -83,6 +88,70 @@ class QtSmokeTests(unittest.TestCase):
         self.assertIn(win.analysis_mode, {"split", "blend", "heatmap", "amplify20"})
         win.close()
 
+    def test_image_signature_tracks_single_lsb(self):
+        try:
+            os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+            from PySide6.QtWidgets import QApplication
+            from ui_qt.main_window import MainWindow
+        except Exception:
+            self.skipTest("PySide6 недоступен в окружении тестов")
+            return
+
+        app = QApplication.instance() or QApplication([])
+        win = MainWindow()
+        arr = np.full((300, 300, 3), 128, dtype=np.uint8)
+        base = win._image_signature(Image.fromarray(arr, mode="RGB"))
+        # Встраивание меняет младшие биты редких пикселей: подпись по миниатюре их бы не заметила.
+        arr[151, 7, 2] ^= 1
+        self.assertNotEqual(base, win._image_signature(Image.fromarray(arr, mode="RGB")))
+        win.close()
+
+    def test_analysis_cache_evicts_least_recent(self):
+        try:
+            os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+            from PySide6.QtWidgets import QApplication
+            from ui_qt import main_window
+        except Exception:
+            self.skipTest("PySide6 недоступен в окружении тестов")
+            return
+
+        app = QApplication.instance() or QApplication([])
+        win = main_window.MainWindow()
+
+        def payload():
+            return {
+                "preview": np.zeros((10, 10, 3), dtype=np.uint8),
+                "delta_map": np.zeros((10, 10), dtype=np.uint8),
+                "hotspot": np.zeros((12, 12), dtype=np.float32),
+            }
+
+        size = main_window._payload_nbytes(payload())
+        with mock.patch.object(main_window, "_ANALYSIS_CACHE_BYTES", size * 2):
+            for key in ("a", "b", "c"):
+                win._store_analysis_result((key,), payload())
+        self.assertEqual(list(win.analysis_cache), [("b",), ("c",)])
+        self.assertEqual(win._analysis_cache_bytes, size * 2)
+        win.close()
+
+    def test_pixmap_round_trip_keeps_odd_widths(self):
+        try:
+            os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+            from PySide6.QtWidgets import QApplication
+            from ui_qt.image_utils import pil_to_pixmap, pixmap_to_pil
+        except Exception:
+            self.skipTest("PySide6 недоступен в окружении тестов")
+            return
+
+        app = QApplication.instance() or QApplication([])
+        rng = np.random.default_rng(17)
+        # Ширины, при которых строка RGB888 не кратна 4 байтам и QImage дополняет её.
+        for width in (1, 3, 5, 173):
+            with self.subTest(width=width):
+                arr = rng.integers(0, 256, size=(7, width, 3), dtype=np.uint8)
+                back = pixmap_to_pil(pil_to_pixmap(Image.fromarray(arr, mode="RGB")))
+                self.assertEqual(back.size, (width, 7))
+                self.assertTrue((np.asarray(back) == arr).all())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,7 @@
 import os
 import tempfile
 import unittest
+import uuid
 import zipfile
 
 from PIL import Image
@@ -38,6 +39,8 @@ class ReportSchemaTests(unittest.TestCase):
         self.assertIn("robustness_score", report)
         self.assertIn("visual_artifacts", report)
         self.assertIn("recommendation", report)
+        report_id = report["meta"]["report_id"]
+        self.assertEqual(report_id, str(uuid.UUID(report_id)))
 
         txt = render_report_text(report)
         self.assertIn("Дополнительные поля 1.1", txt)
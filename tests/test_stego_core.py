@@ -1,7 +1,9 @@
 import unittest
 
+import numpy as np
 from PIL import Image
 
+from core import stego
 from core.stego import (
     decode_text_from_image,
     encode_text_into_image,
@@ -23,6 +25,41 @@ class StegoCoreTests(unittest.TestCase):
                     decoded = decode_text_from_image(encoded, password, bits, method)
                     self.assertEqual(decoded, message)
 
+    def test_encode_touches_only_payload_bits(self):
+        rng = np.random.default_rng(7)
+        image = Image.fromarray(rng.integers(0, 256, size=(24, 31, 3), dtype=np.uint8), mode="RGB")
+        for bits in (1, 2, 3):
+            for method in ("sequential", "interleaved"):
+                with self.subTest(bits=bits, method=method):
+                    encoded = encode_text_into_image(image, "abc", "", bits, method)
+                    before = np.array(image).reshape(-1, 3)
+                    after = np.array(encoded).reshape(-1, 3)
+                    used_pixels = -(-(4 + 3) * 8 // (3 * bits))
+                    self.assertTrue((before[used_pixels:] == after[used_pixels:]).all())
+                    keep_mask = np.uint8(0xFF ^ ((1 << bits) - 1))
+                    self.assertTrue(((before & keep_mask) == (after & keep_mask)).all())
+
+    def test_numba_kernels_match_numpy_path(self):
+        if stego.stego_numba is None:
+            self.skipTest("numba недоступна в окружении тестов")
+        rng = np.random.default_rng(11)
+        flat = rng.integers(0, 256, size=(257, 3), dtype=np.uint8)
+        payload = rng.integers(0, 256, size=61, dtype=np.uint8).tobytes()
+        for bits in (1, 2, 3):
+            for method in ("sequential", "interleaved"):
+                with self.subTest(bits=bits, method=method):
+                    channels, shifts = stego.get_carrier_tables(bits, method)
+                    expected = flat.copy()
+                    stego._embed_payload_numpy(expected, payload, channels, shifts)
+                    actual = flat.copy()
+                    stego.stego_numba.embed_payload(actual, np.frombuffer(payload, dtype=np.uint8), channels, shifts)
+                    self.assertTrue((expected == actual).all())
+                    n_bytes = flat.shape[0] * channels.size // 8
+                    self.assertEqual(
+                        stego.stego_numba.extract_payload(actual, channels, shifts, n_bytes).tobytes(),
+                        stego._extract_payload_numpy(actual, channels, shifts, n_bytes),
+                    )
+
     def test_capacity_check_raises(self):
         tiny = Image.new("RGB", (8, 8), (40, 80, 120))
         bits = 1
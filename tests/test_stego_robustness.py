@@ -59,9 +59,9 @@ class StegoRobustnessTests(unittest.TestCase):
         rng = np.random.default_rng(123)
         arr = np.array(self.encoded, dtype=np.int16)
         noise = rng.integers(-30, 31, size=arr.shape, dtype=np.int16)
-        mask = rng.random((arr.shape[0], arr.shape[1], 1)) < 0.12
-        noisy = np.where(mask, arr + noise, arr)
-        noisy = np.clip(noisy, 0, 255).astype(np.uint8)
+        mask = rng.random((arr.shape[0], arr.shape[1])) < 0.12
+        arr[mask] = np.clip(arr[mask] + noise[mask], 0, 255)
+        noisy = arr.astype(np.uint8)
         restored = Image.fromarray(noisy, mode="RGB")
         self.assert_decode_corrupted(restored)
 
@@ -1,8 +1,11 @@
 import unittest
+from concurrent.futures import CancelledError
+from unittest import mock
 
 import numpy as np
 from PIL import Image
 
+from core import visual_analysis
 from core.visual_analysis import (
     build_analysis_preview,
     compute_delta_map,
@@ -34,6 +37,19 @@ class VisualAnalysisTests(unittest.TestCase):
         self.assertEqual(info["channels"][0]["before_bits"], "01100100")
         self.assertEqual(info["channels"][0]["after_bits"], "01100101")
 
+    def test_probe_pixel_accepts_arrays(self):
+        arrays = probe_pixel(np.asarray(self.original), np.asarray(self.modified), 2, 7)
+        self.assertEqual(arrays, probe_pixel(self.original, self.modified, 2, 7))
+        self.assertEqual(arrays["delta"], (0, 3, 0))
+
+    def test_rgb_array_is_cached_per_image(self):
+        first = visual_analysis.rgb_array(self.original)
+        self.assertIs(visual_analysis.rgb_array(self.original), first)
+        resized = self.original.resize((5, 5))
+        self.assertEqual(visual_analysis.rgb_array(resized).shape, (5, 5, 3))
+        gray = self.original.convert("L")
+        self.assertEqual(visual_analysis.rgb_array(gray).shape, (10, 10, 3))
+
     def test_hotspot_grid_is_normalized(self):
         delta = compute_delta_map(self.original, self.modified, threshold=0)
         grid = compute_hotspot_grid(delta, rows=4, cols=5)
@@ -41,11 +57,89 @@ class VisualAnalysisTests(unittest.TestCase):
         self.assertGreaterEqual(float(grid.min()), 0.0)
         self.assertLessEqual(float(grid.max()), 1.0)
 
+    def test_hotspot_grid_keeps_fractional_float_deltas(self):
+        delta = np.random.default_rng(11).random((37, 53))
+        grid = compute_hotspot_grid(delta, rows=5, cols=7)
+        self.assertGreater(float(grid.max()), 0.0)
+        np.testing.assert_allclose(grid, _tile_mean_grid(delta, 5, 7), rtol=1e-5)
+
+    def test_hotspot_grid_matches_tile_means_for_other_dtypes(self):
+        rng = np.random.default_rng(13)
+        maps = {
+            "int16": rng.integers(0, 600, size=(29, 41)).astype(np.int16),
+            "bool": rng.random((29, 41)) < 0.3,
+            "float32": (rng.random((29, 41)) * 10.0).astype(np.float32),
+        }
+        for name, delta in maps.items():
+            with self.subTest(dtype=name):
+                grid = compute_hotspot_grid(delta, rows=4, cols=6)
+                np.testing.assert_allclose(grid, _tile_mean_grid(delta, 4, 6), rtol=1e-5)
+
     def test_threshold_filters_small_changes(self):
         delta = compute_delta_map(self.original, self.modified, threshold=2)
         self.assertEqual(int(delta[3, 4]), 0)
         self.assertEqual(int(delta[7, 2]), 3)
 
+    def test_delta_map_numba_matches_numpy(self):
+        if visual_analysis.visual_numba is None:
+            self.skipTest("numba недоступна в окружении тестов")
+        rng = np.random.default_rng(5)
+        original = Image.fromarray(rng.integers(0, 256, size=(33, 47, 3), dtype=np.uint8), mode="RGB")
+        modified = Image.fromarray(rng.integers(0, 256, size=(33, 47, 3), dtype=np.uint8), mode="RGB")
+        for threshold in (0, 1, 90, 255):
+            with self.subTest(threshold=threshold):
+                fast = compute_delta_map(original, modified, threshold=threshold)
+                with mock.patch.object(visual_analysis, "visual_numba", None):
+                    slow = compute_delta_map(original, modified, threshold=threshold)
+                self.assertEqual(fast.dtype, np.uint8)
+                self.assertTrue((fast == slow).all())
+
+    def test_heatmap_numba_matches_lut_gather(self):
+        if visual_analysis.visual_numba is None:
+            self.skipTest("numba недоступна в окружении тестов")
+        delta = np.random.default_rng(9).integers(0, 9, size=(21, 34), dtype=np.uint8)
+        for source in (delta, np.zeros_like(delta)):
+            fast = visual_analysis.compute_heatmap(source)
+            with mock.patch.object(visual_analysis, "visual_numba", None):
+                slow = visual_analysis.compute_heatmap(source)
+            self.assertTrue((fast == slow).all())
+
+    def test_amplified_preview_matches_palette_indexing(self):
+        delta = np.random.default_rng(3).integers(0, 12, size=(19, 26), dtype=np.uint8)
+        preview = np.asarray(visual_analysis._build_amplified_delta(delta, amplify=20))
+        with mock.patch.object(visual_analysis, "visual_numba", None):
+            slow = np.asarray(visual_analysis._build_amplified_delta(delta, amplify=20))
+        self.assertEqual(preview.shape, (19, 26, 3))
+        self.assertTrue((preview == slow).all())
+        # Значение 0 и максимум карты дают крайние цвета палитры.
+        self.assertTrue((preview[delta == 0] == preview[delta == 0][0]).all())
+
+    def test_threaded_numpy_delta_matches_single_pass(self):
+        rng = np.random.default_rng(7)
+        orig = rng.integers(0, 256, size=(29, 13, 3), dtype=np.uint8)
+        mod = rng.integers(0, 256, size=(29, 13, 3), dtype=np.uint8)
+        with mock.patch.object(visual_analysis, "visual_numba", None), mock.patch.object(
+            visual_analysis, "_PARALLEL_MIN_PIXELS", 0
+        ), mock.patch.object(visual_analysis.os, "cpu_count", return_value=4):
+            tiled = visual_analysis.compute_delta_map_from_arrays(orig, mod, threshold=40)
+        self.assertTrue((tiled == visual_analysis._delta_rows(orig, mod, 40)).all())
+
+    def test_visual_stats_numba_matches_numpy(self):
+        if visual_analysis.visual_numba is None:
+            self.skipTest("numba недоступна в окружении тестов")
+        rng = np.random.default_rng(9)
+        delta = rng.integers(0, 256, size=(41, 29), dtype=np.uint8)
+        delta[rng.random(delta.shape) < 0.8] = 0
+        fast = compute_visual_stats(delta, threshold=4)
+        with mock.patch.object(visual_analysis, "visual_numba", None):
+            slow = compute_visual_stats(delta, threshold=4)
+        self.assertAlmostEqual(fast.changed_pct, slow.changed_pct)
+        self.assertAlmostEqual(fast.mean_delta, slow.mean_delta)
+        self.assertEqual(fast.max_delta, slow.max_delta)
+        self.assertAlmostEqual(fast.hotspot_score, slow.hotspot_score, places=4)
+        self.assertAlmostEqual(slow.hotspot_score, float(np.percentile(delta, 95)), places=4)
+        self.assertAlmostEqual(slow.mean_delta, float(np.mean(delta)))
+
     def test_build_preview_returns_stats(self):
         preview, delta, stats, hotspot = build_analysis_preview(
             self.original,
@@ -58,6 +152,17 @@ class VisualAnalysisTests(unittest.TestCase):
         self.assertGreater(stats.changed_pct, 0.0)
         self.assertEqual(hotspot.shape, (12, 12))
 
+    def test_build_preview_stops_when_cancelled(self):
+        calls = []
+
+        def should_continue():
+            calls.append(1)
+            return len(calls) < 2
+
+        with self.assertRaises(CancelledError):
+            build_analysis_preview(self.original, self.modified, mode="split", should_continue=should_continue)
+        self.assertEqual(len(calls), 2)
+
     def test_compute_visual_stats_for_empty_map(self):
         stats = compute_visual_stats(np.zeros((4, 4), dtype=np.uint8), threshold=3)
         self.assertEqual(stats.changed_pct, 0.0)
@@ -65,5 +170,21 @@ class VisualAnalysisTests(unittest.TestCase):
         self.assertEqual(stats.threshold, 3)
 
 
+def _tile_mean_grid(delta: np.ndarray, rows: int, cols: int) -> np.ndarray:
+    """Эталон: нормированные средние по тайлам, как в исходной поштучной реализации."""
+    h, w = delta.shape
+    grid = np.zeros((rows, cols), dtype=np.float32)
+    for r in range(rows):
+        y0, y1 = int(round(r * h / rows)), int(round((r + 1) * h / rows))
+        for c in range(cols):
+            x0, x1 = int(round(c * w / cols)), int(round((c + 1) * w / cols))
+            tile = delta[y0:y1, x0:x1]
+            grid[r, c] = float(tile.mean()) if tile.size else 0.0
+    max_val = float(grid.max())
+    if max_val > 0:
+        grid /= max_val
+    return grid
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,11 +1,22 @@
 from __future__ import annotations
 
-import json
+import copy
 from typing import Any, Callable, Dict, List, Mapping, Sequence
 
 import numpy as np
-from PIL import Image, ImageDraw
-from PySide6.QtCore import QEasingCurve, QPropertyAnimation, Qt, QTimer
+from PIL import Image
+from PySide6.QtCore import (
+    QAbstractTableModel,
+    QEasingCurve,
+    QModelIndex,
+    QObject,
+    QPropertyAnimation,
+    QRunnable,
+    QThreadPool,
+    Qt,
+    QTimer,
+    Signal,
+)
 from PySide6.QtGui import QColor, QPainter, QPen, QPixmap
 from PySide6.QtWidgets import (
     QCheckBox,
@@ -17,17 +28,17 @@ from PySide6.QtWidgets import (
     QProgressBar,
     QPushButton,
     QSlider,
+    QTableView,
     QTabWidget,
-    QTableWidget,
-    QTableWidgetItem,
     QVBoxLayout,
     QWidget,
 )
 
 from core.analysis import compute_change_heatmap
-from core.report import render_presentation_summary, render_report_text
+from core.report import render_presentation_summary, render_report_json_bytes, render_report_text
+from core.visual_analysis import amplify_palette, compute_delta_map_from_arrays
 from ui_qt.graphics_view import ImageGraphicsView
-from ui_qt.image_utils import pil_to_pixmap
+from ui_qt.image_utils import ndarray_to_pixmap, pil_to_pixmap
 
 
 class CompareDialog(QDialog):
@@ -37,6 +48,16 @@ class CompareDialog(QDialog):
         self.resize(980, 700)
         self.original = original.convert("RGB")
         self.modified = modified.convert("RGB")
+        # Изображения в диалоге не меняются: дельта и тяжёлые режимы считаются один раз.
+        self._orig_arr = np.asarray(self.original)
+        self._mod_arr = np.asarray(self.modified)
+        self._max_delta: np.ndarray | None = None
+        self._changed_pct: float | None = None
+        self._mode_pixmaps: Dict[str, QPixmap] = {}
+        self._last_frames: Dict[str, tuple[tuple[int, bool], QPixmap]] = {}
+        self._full_layers = _CompareLayers(self._orig_arr, self._mod_arr)
+        self._preview_layers: _CompareLayers | None = None
+        self._interactive = False
         self.mode = "split"
         self.blink = False
         self._blink_state = False
@@ -64,7 +85,9 @@ class CompareDialog(QDialog):
         self.slider = QSlider(Qt.Orientation.Horizontal)
         self.slider.setRange(0, 100)
         self.slider.setValue(50)
-        self.slider.valueChanged.connect(lambda _: self.render())
+        self.slider.valueChanged.connect(self._schedule_render)
+        self.slider.sliderPressed.connect(self._begin_interactive)
+        self.slider.sliderReleased.connect(self._end_interactive)
         controls.addWidget(self.slider, 1)
         self.blink_check = QCheckBox("Мигание слоёв")
         self.blink_check.toggled.connect(self._set_blink)
@@ -79,6 +102,11 @@ class CompareDialog(QDialog):
         self.timer = QTimer(self)
         self.timer.setInterval(450)
         self.timer.timeout.connect(self._tick_blink)
+        # События ползунка схлопываются: не больше одного кадра на ~16 мс.
+        self.render_timer = QTimer(self)
+        self.render_timer.setInterval(16)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.timeout.connect(self.render)
 
         self._animate_open()
         self.render()
@@ -93,6 +121,34 @@ class CompareDialog(QDialog):
         self._anim = anim
         anim.start()
 
+    def _schedule_render(self, _value: int = 0):
+        # Теплокарта и усиление от ползунка не зависят — их кадр уже в кэше.
+        if self.mode not in ("split", "blend"):
+            return
+        # Таймер не перезапускается: при непрерывном перетаскивании кадр всё равно
+        # выходит раз в интервал и берёт последнее значение ползунка.
+        if not self.render_timer.isActive():
+            self.render_timer.start()
+
+    def _begin_interactive(self):
+        self._interactive = True
+
+    def _end_interactive(self):
+        self._interactive = False
+        self.render_timer.stop()
+        if self.mode in ("split", "blend"):
+            self.render()
+
+    def _active_layers(self) -> "_CompareLayers":
+        # Пока ползунок тянут, крупные кадры собираются в половинном разрешении.
+        if not self._interactive or self._orig_arr.shape[0] * self._orig_arr.shape[1] < _PREVIEW_MIN_PIXELS:
+            return self._full_layers
+        if self._preview_layers is None:
+            self._preview_layers = _CompareLayers(
+                np.ascontiguousarray(self._orig_arr[::2, ::2]), np.ascontiguousarray(self._mod_arr[::2, ::2])
+            )
+        return self._preview_layers
+
     def _on_mode_changed(self, idx: int):
         w = self.mode_tabs.widget(idx)
         self.mode = w.property("mode")
@@ -108,65 +164,148 @@ class CompareDialog(QDialog):
             self.render()
 
     def _tick_blink(self):
+        # Свёрнутое окно не перерисовывается: мигание продолжится после восстановления.
+        if not self.isVisible() or self.isMinimized():
+            return
         self._blink_state = not self._blink_state
         self.render()
 
+    def showEvent(self, event):
+        if self.blink:
+            self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
     def render(self):
-        ratio = max(0.0, min(1.0, self.slider.value() / 100.0))
-        orig = self.original
-        mod = self.modified
-        delta = None
-        changed_pct = None
+        # setRange(0, 100) уже ограничивает ползунок: позиция берётся как целые проценты.
+        percent = self.slider.value()
 
         if self.blink and self.mode in {"split", "blend"}:
-            composed = orig if self._blink_state else mod
+            # Кадры мигания — исходные изображения, pixmap для каждого строится один раз.
+            key = "blink-orig" if self._blink_state else "blink-mod"
+            pixmap = self._mode_pixmaps.get(key)
+            if pixmap is None:
+                pixmap = self._mode_pixmaps[key] = ndarray_to_pixmap(
+                    self._orig_arr if self._blink_state else self._mod_arr
+                )
             mode_label = "МИГАНИЕ: ОРИГИНАЛ" if self._blink_state else "МИГАНИЕ: ИЗМЕНЁННОЕ"
-        elif self.mode == "blend":
-            composed = Image.blend(orig, mod, ratio)
-            mode_label = f"СМЕШИВАНИЕ {ratio * 100:.0f}%"
-        elif self.mode == "heatmap":
-            delta = np.abs(np.array(mod, dtype=np.int16) - np.array(orig, dtype=np.int16))
-            changed_pct = float(np.mean(np.any(delta > 0, axis=2)) * 100.0)
-            composed = compute_change_heatmap(orig, mod)
-            mode_label = f"ТЕПЛОКАРТА · изменено {changed_pct:.2f}%"
-        elif self.mode == "amplify20":
-            delta = np.abs(np.array(mod, dtype=np.int16) - np.array(orig, dtype=np.int16))
-            changed_pct = float(np.mean(np.any(delta > 0, axis=2)) * 100.0)
-
-            # Усиление отличий + автонормализация, чтобы режим оставался видимым
-            # даже при очень малых LSB-сдвигах (обычно 1..3).
-            amplified = np.clip(delta * 20, 0, 255).astype(np.uint8)
-            max_amp = int(amplified.max())
-            if max_amp > 0:
-                scaled = (amplified.astype(np.float32) / float(max_amp) * 255.0).astype(np.uint8)
-            else:
-                scaled = amplified
-
-            mag = scaled.max(axis=2).astype(np.float32) / 255.0
-            # Небольшой базовый синий фон убирает "полностью чёрный" вид
-            # и делает режим более читабельным для глаз.
-            r = np.clip((mag ** 0.7) * 255.0, 0, 255).astype(np.uint8)
-            g = np.clip((mag ** 1.0) * 210.0 + 6.0, 0, 255).astype(np.uint8)
-            b = np.clip((mag ** 1.6) * 70.0 + 26.0, 0, 255).astype(np.uint8)
-            composed = Image.fromarray(np.stack([r, g, b], axis=2), mode="RGB")
-            mode_label = f"УСИЛЕНИЕ ×20 · изменено {changed_pct:.2f}%"
+        elif self.mode in ("heatmap", "amplify20"):
+            # Эти режимы не зависят от ползунка: готовый pixmap берётся из кэша.
+            pixmap = self._mode_pixmaps.get(self.mode)
+            if pixmap is None:
+                if self.mode == "heatmap":
+                    pixmap = pil_to_pixmap(compute_change_heatmap(self.original, self.modified))
+                else:
+                    pixmap = ndarray_to_pixmap(self._build_amplified())
+                self._mode_pixmaps[self.mode] = pixmap
+            prefix = "ТЕПЛОКАРТА" if self.mode == "heatmap" else "УСИЛЕНИЕ ×20"
+            mode_label = f"{prefix} · изменено {self._get_changed_pct():.2f}%"
         else:
-            split_x = int(orig.width * ratio)
-            composed = mod.copy()
-            if split_x > 0:
-                composed.paste(orig.crop((0, 0, split_x, orig.height)), (0, 0))
-            # Явный разделитель для режима split, чтобы граница была заметна на любом фоне.
-            if 0 < split_x < composed.width:
-                draw = ImageDraw.Draw(composed)
-                line_w = max(2, composed.width // 420)
-                x = max(1, min(composed.width - 2, split_x))
-                draw.line((x - 1, 0, x - 1, composed.height), fill=(8, 22, 35), width=line_w + 2)
-                draw.line((x, 0, x, composed.height), fill=(255, 209, 102), width=line_w)
-            mode_label = f"РАЗДЕЛЕНИЕ {ratio * 100:.0f}%"
-
-        self.view.set_pixmap(pil_to_pixmap(composed))
+            # Последний кадр split/blend хранится по режиму: переключение вкладок
+            # без сдвига ползунка лишь возвращает готовый pixmap.
+            layers = self._active_layers()
+            key = (percent, layers is self._full_layers)
+            cached = self._last_frames.get(self.mode)
+            if cached is not None and cached[0] == key:
+                pixmap = cached[1]
+            else:
+                # Кадры — массивы uint8, в pixmap идут без PIL.
+                composed = layers.blend(percent) if self.mode == "blend" else layers.split(percent)
+                pixmap = ndarray_to_pixmap(composed)
+                self._last_frames[self.mode] = (key, pixmap)
+            mode_label = f"{'СМЕШИВАНИЕ' if self.mode == 'blend' else 'РАЗДЕЛЕНИЕ'} {percent}%"
+
+        self.view.set_pixmap(pixmap)
         self.hud.setText(mode_label)
 
+    def _get_max_delta(self) -> np.ndarray:
+        """Максимальная по каналам |mod - orig| — карта (H, W) uint8."""
+        if self._max_delta is None:
+            # Выбор ветки остаётся за core: numba-ядро под KERNEL_LOCK или NumPy-полосы.
+            self._max_delta = compute_delta_map_from_arrays(self._orig_arr, self._mod_arr, threshold=0)
+        return self._max_delta
+
+    def _get_changed_pct(self) -> float:
+        if self._changed_pct is None:
+            mag = self._get_max_delta()
+            self._changed_pct = np.count_nonzero(mag) / mag.size * 100.0 if mag.size else 0.0
+        return self._changed_pct
+
+    def _build_amplified(self) -> np.ndarray:
+        # Усиление отличий + автонормализация, чтобы режим оставался видимым
+        # даже при очень малых LSB-сдвигах (обычно 1..3). Цвет пикселя зависит
+        # только от максимальной по каналам дельты, поэтому вся цепочка сводится
+        # к палитре на 256 уровней и одному gather по карте.
+        mag = self._get_max_delta()
+        amplified = np.minimum(np.arange(256, dtype=np.uint16) * 20, 255).astype(np.uint8)
+        max_amp = int(amplified[int(mag.max())]) if mag.size else 0
+        if max_amp > 0:
+            scaled = (amplified.astype(np.float32) / float(max_amp) * 255.0).astype(np.uint8)
+        else:
+            scaled = amplified
+        return _AMPLIFY_COLORS[scaled][mag]
+
+
+# Кадры меньше ~1 Мп собираются быстро и без уменьшенного превью.
+_PREVIEW_MIN_PIXELS = 1 << 20
+
+
+class _CompareLayers:
+    """Кадры режимов «Разделение» и «Смешивание» для одной пары массивов (H, W, 3) uint8.
+
+    Результат пишется в общий буфер и действителен до следующего вызова.
+    """
+
+    def __init__(self, orig: np.ndarray, mod: np.ndarray):
+        self.orig = orig
+        self.mod = mod
+        self.buf = np.empty_like(orig)
+        self._diff: np.ndarray | None = None
+        self._tmp: np.ndarray | None = None
+
+    def split(self, percent: int) -> np.ndarray:
+        # Кадр собирается срезами в постоянный буфер: без copy/crop/paste на каждый тик.
+        buf = self.buf
+        width = buf.shape[1]
+        split_x = width * percent // 100
+        buf[:, :split_x] = self.orig[:, :split_x]
+        buf[:, split_x:] = self.mod[:, split_x:]
+        # Явный разделитель для режима split, чтобы граница была заметна на любом фоне.
+        if 0 < split_x < width:
+            line_w = max(2, width // 420)
+            x = max(1, min(width - 2, split_x))
+            _fill_columns(buf, x - 1, line_w + 2, (8, 22, 35))
+            _fill_columns(buf, x, line_w, (255, 209, 102))
+        return buf
+
+    def blend(self, percent: int) -> np.ndarray:
+        """orig + (mod - orig) * percent // 100 в целых числах."""
+        if self._diff is None:
+            self._diff = self.mod.astype(np.int16)
+            self._diff -= self.orig
+            self._tmp = np.empty_like(self._diff)
+        tmp = self._tmp
+        # |diff| * 100 <= 25500 — int16 не переполняется.
+        np.multiply(self._diff, percent, out=tmp)
+        np.floor_divide(tmp, 100, out=tmp)
+        tmp += self.orig
+        np.copyto(self.buf, tmp, casting="unsafe")
+        return self.buf
+
+
+def _fill_columns(buf: np.ndarray, x: int, width: int, color: tuple[int, int, int]) -> None:
+    # Те же столбцы, что закрашивает ImageDraw.line по вертикали с толщиной width.
+    x0 = max(0, x - (width - 1) // 2)
+    x1 = min(buf.shape[1], x + width // 2 + 1)
+    buf[:, x0:x1] = color
+
+
+# Та же палитра, что у превью усиления в core, по 256 уровням нормированной дельты.
+_AMPLIFY_COLORS = amplify_palette(np.arange(256, dtype=np.float32) / 255.0)
+
 
 class AttackLabDialog(QDialog):
     def __init__(self, rows: Sequence[Mapping[str, Any]], parent=None):
@@ -177,22 +316,15 @@ class AttackLabDialog(QDialog):
         root = QVBoxLayout(self)
         root.addWidget(QLabel("Результаты устойчивости к атакам"))
 
-        table = QTableWidget(0, 3)
-        table.setHorizontalHeaderLabels(["Атака", "Извлечение", "Детали"])
-        table.horizontalHeader().setStretchLastSection(True)
-        root.addWidget(table, 1)
-
         passed = 0
+        cells: List[tuple[str, ...]] = []
         for row in rows:
             ok = bool(row.get("success"))
             if ok:
                 passed += 1
             detail = "без ошибок" if ok else (row.get("error") or row.get("preview_text") or "сообщение не совпало")
-            ridx = table.rowCount()
-            table.insertRow(ridx)
-            table.setItem(ridx, 0, QTableWidgetItem(str(row.get("name", "-"))))
-            table.setItem(ridx, 1, QTableWidgetItem("УСПЕХ" if ok else "СБОЙ"))
-            table.setItem(ridx, 2, QTableWidgetItem(str(detail)))
+            cells.append((str(row.get("name", "-")), "УСПЕХ" if ok else "СБОЙ", str(detail)))
+        root.addWidget(_make_table_view(("Атака", "Извлечение", "Детали"), cells, self), 1)
 
         root.addWidget(QLabel(f"Успешно: {passed}/{len(rows)}"))
 
@@ -206,25 +338,24 @@ class BenchmarkDialog(QDialog):
         root = QVBoxLayout(self)
         root.addWidget(QLabel("Автопрогон: метод × биты"))
 
-        table = QTableWidget(0, 6)
-        table.setHorizontalHeaderLabels(["Метод", "Биты", "Влезает", "Извлечение", "PSNR", "SSIM"])
-        table.horizontalHeader().setStretchLastSection(True)
-        root.addWidget(table, 1)
-
         best = None
+        cells: List[tuple[str, ...]] = []
         for row in rows:
             method_label = "Последовательный" if row.get("method") == "sequential" else "Чередование"
             ok = bool(row.get("decode_ok"))
-            ridx = table.rowCount()
-            table.insertRow(ridx)
-            table.setItem(ridx, 0, QTableWidgetItem(method_label))
-            table.setItem(ridx, 1, QTableWidgetItem(str(row.get("bits", "-"))))
-            table.setItem(ridx, 2, QTableWidgetItem("ДА" if row.get("fit") else "НЕТ"))
-            table.setItem(ridx, 3, QTableWidgetItem("УСПЕХ" if ok else "СБОЙ"))
-            table.setItem(ridx, 4, QTableWidgetItem("-" if row.get("psnr_db") is None else f"{row['psnr_db']:.2f}"))
-            table.setItem(ridx, 5, QTableWidgetItem("-" if row.get("ssim") is None else f"{row['ssim']:.4f}"))
+            cells.append(
+                (
+                    method_label,
+                    str(row.get("bits", "-")),
+                    "ДА" if row.get("fit") else "НЕТ",
+                    "УСПЕХ" if ok else "СБОЙ",
+                    "-" if row.get("psnr_db") is None else f"{row['psnr_db']:.2f}",
+                    "-" if row.get("ssim") is None else f"{row['ssim']:.4f}",
+                )
+            )
             if ok and row.get("ssim") is not None and (best is None or row["ssim"] > best["ssim"]):
                 best = dict(row)
+        root.addWidget(_make_table_view(("Метод", "Биты", "Влезает", "Извлечение", "PSNR", "SSIM"), cells, self), 1)
 
         if best:
             method = "Последовательный" if best.get("method") == "sequential" else "Чередование"
@@ -234,6 +365,38 @@ class BenchmarkDialog(QDialog):
         root.addWidget(QLabel(text))
 
 
+class _RowsTableModel(QAbstractTableModel):
+    """Таблица только для чтения поверх готовых строк: без QTableWidgetItem на ячейку."""
+
+    def __init__(self, headers: Sequence[str], cells: Sequence[Sequence[str]], parent=None):
+        super().__init__(parent)
+        self._headers = tuple(headers)
+        self._cells = cells
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._cells)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._headers)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        return self._cells[index.row()][index.column()]
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._headers[section]
+        return super().headerData(section, orientation, role)
+
+
+def _make_table_view(headers: Sequence[str], cells: Sequence[Sequence[str]], parent: QWidget) -> QTableView:
+    view = QTableView(parent)
+    view.setModel(_RowsTableModel(headers, cells, view))
+    view.horizontalHeader().setStretchLastSection(True)
+    return view
+
+
 class ReportPreviewDialog(QDialog):
     def __init__(self, report: Dict[str, Any], on_save_json, on_save_txt, parent=None):
         super().__init__(parent)
@@ -249,19 +412,12 @@ class ReportPreviewDialog(QDialog):
         tabs = QTabWidget()
         root.addWidget(tabs, 1)
 
-        self.txt_tab = QPlainTextEdit()
-        self.txt_tab.setReadOnly(True)
-        self.txt_tab.setPlainText(render_report_text(report))
+        # Тексты вкладок формируются в фоне: окно открывается сразу с заглушкой.
+        self.txt_tab = self._placeholder_tab()
         tabs.addTab(self.txt_tab, "TXT")
-
-        self.json_tab = QPlainTextEdit()
-        self.json_tab.setReadOnly(True)
-        self.json_tab.setPlainText(json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True))
+        self.json_tab = self._placeholder_tab()
         tabs.addTab(self.json_tab, "JSON")
-
-        self.summary_tab = QPlainTextEdit()
-        self.summary_tab.setReadOnly(True)
-        self.summary_tab.setPlainText(render_presentation_summary(report))
+        self.summary_tab = self._placeholder_tab()
         tabs.addTab(self.summary_tab, "Сводка")
 
         bottom = QHBoxLayout()
@@ -278,6 +434,49 @@ class ReportPreviewDialog(QDialog):
         bottom.addWidget(btn_close)
         root.addLayout(bottom)
 
+        self._render_worker = _ReportRenderWorker(report)
+        self._render_worker.signals.result.connect(self._apply_rendered)
+        QThreadPool.globalInstance().start(self._render_worker)
+
+    @staticmethod
+    def _placeholder_tab() -> QPlainTextEdit:
+        tab = QPlainTextEdit()
+        tab.setReadOnly(True)
+        tab.setPlainText("Формирование отчёта...")
+        return tab
+
+    def _apply_rendered(self, texts: Dict[str, str]):
+        self.txt_tab.setPlainText(texts["txt"])
+        self.json_tab.setPlainText(texts["json"])
+        self.summary_tab.setPlainText(texts["summary"])
+
+
+class _ReportRenderSignals(QObject):
+    result = Signal(object)
+
+
+class _ReportRenderWorker(QRunnable):
+    def __init__(self, report: Dict[str, Any]):
+        super().__init__()
+        self.signals = _ReportRenderSignals()
+        # Пока идёт рендер, окно сохранения может дописывать поля в отчёт (не глубже
+        # вложенных словарей вроде artifacts). В GUI-потоке копируются только эти два
+        # уровня ключей, глубокий снимок значений делается уже в run().
+        self.report = {key: dict(value) if isinstance(value, dict) else value for key, value in report.items()}
+
+    def run(self):
+        try:
+            report = copy.deepcopy(self.report)
+            texts = {
+                "txt": render_report_text(report),
+                "json": render_report_json_bytes(report).decode("utf-8"),
+                "summary": render_presentation_summary(report),
+            }
+        except Exception as exc:
+            message = f"Не удалось сформировать отчёт: {exc}"
+            texts = {"txt": message, "json": message, "summary": message}
+        self.signals.result.emit(texts)
+
 
 class DemoTimelineDialog(QDialog):
     def __init__(self, steps: Sequence[tuple[str, Callable[[], str]]], parent=None):
@@ -343,9 +542,8 @@ class DemoTimelineDialog(QDialog):
             self.btn_close.setText("Закрыть")
 
     def _append(self, line: str):
-        text = self.log.toPlainText().strip()
-        text = (text + "\n" + line).strip() if text else line
-        self.log.setPlainText(text)
+        # Дописывается только новая строка: без копии и перевёрстки всего журнала.
+        self.log.appendPlainText(line)
         self.log.verticalScrollBar().setValue(self.log.verticalScrollBar().maximum())
 
 
@@ -401,7 +599,189 @@ class DemoResultDialog(QDialog):
         root.addLayout(row2)
 
 
+# Тексты справки собираются один раз при импорте модуля.
+_HELP_TAB_DATA: tuple[tuple[str, str], ...] = (
+    (
+        "Быстрый старт",
+        "\n".join(
+            [
+                "Сценарий 1: скрыть и извлечь сообщение",
+                "",
+                "1. Нажмите «Открыть изображение» и выберите контейнер.",
+                "2. В поле «Сообщение» введите текст для скрытия.",
+                "3. Опционально заполните «Пароль»: он применяется как XOR-маска.",
+                "4. Выберите «Бит на канал» (1, 2 или 3).",
+                "5. Выберите «Метод сокрытия»:",
+                "   - Последовательный (R->G->B): выше качество изображения.",
+                "   - Чередование каналов: немного равномернее распределение изменений.",
+                "6. Нажмите «Спрятать».",
+                "7. После встраивания нажмите «Извлечь» для проверки.",
+                "8. Сохраните результат: «Сохранить как...», «Экспорт отчёта», «Экспорт архива данных».",
+                "",
+                "Сценарий 2: только проверить чужое изображение",
+                "",
+                "1. Откройте файл.",
+                "2. При необходимости введите пароль.",
+                "3. Нажмите «Извлечь».",
+                "4. Оцените метрики и риск в правой панели.",
+            ]
+        ),
+    ),
+    (
+        "Панель управления",
+        "\n".join(
+            [
+                "Что означают элементы справа",
+                "",
+                "Риск:",
+                "LOW / MEDIUM / HIGH — оценка заметности скрытия по LSB-статистике и загрузке контейнера.",
+                "",
+                "Загрузка контейнера:",
+                "Показывает, какую долю доступной ёмкости занимает сообщение.",
+                "Чем выше процент, тем выше шанс статистического обнаружения.",
+                "",
+                "Устойчивость к атакам:",
+                "Итог по симуляции атак (без атаки, JPEG, resize, шум, blur).",
+                "100% означает, что сообщение восстановилось во всех сценариях.",
+                "",
+                "Кнопки:",
+                "Открыть изображение — загрузка контейнера.",
+                "Сохранить как... — сохранить модифицированное изображение.",
+                "Экспорт отчёта — текст/JSON отчёт с метриками.",
+                "Экспорт архива данных — zip с артефактами анализа.",
+                "Показать гистограмму LSB — распределение младших битов.",
+                "До/После + Теплокарта — визуальный анализ отличий.",
+                "Симулятор атак — проверка устойчивости к искажениям.",
+                "Сравнить режимы — автопрогон метод × биты.",
+                "Демо-режим — быстрый сценарий всех основных инструментов.",
+                "",
+                "Живая аналитика в главном окне:",
+                "Верхняя HUD-плашка показывает процент изменённых пикселей, среднюю и максимальную дельту.",
+                "Миникарта hotspot показывает, в каких областях изменения наиболее плотные.",
+                "Пиксельный инспектор показывает биты канала, LSB до/после и локальную лупу.",
+                "",
+                "Режимы экрана:",
+                "Базовый — показывает только основные действия без перегрузки интерфейса.",
+                "Эксперт — открывает hotspot, инспектор, расширенный анализ и служебные инструменты.",
+                "",
+                "Кнопки в заголовке:",
+                "❔ — открывает это окно справки.",
+                "☀/🌙 — переключает тему (день/ночь) в реальном времени.",
+            ]
+        ),
+    ),
+    (
+        "Режимы сравнения",
+        "\n".join(
+            [
+                "Окно «До/После + Теплокарта»",
+                "",
+                "Разделение:",
+                "Показывает оригинал и модифицированную версию с вертикальным разделителем.",
+                "Ползунок «Положение» меняет границу сравнения.",
+                "",
+                "Смешивание:",
+                "Накладывает изображения друг на друга.",
+                "Удобно для оценки глобальных изменений без резких границ.",
+                "",
+                "Теплокарта:",
+                "Цветом показывает, где изменения наиболее выражены.",
+                "Синий/холодный — малые изменения, тёплые оттенки — более сильные.",
+                "",
+                "Усиление ×20:",
+                "Специальный режим для наглядного усиления малых различий LSB.",
+                "Используется для визуальной диагностики, а не как итоговое изображение.",
+                "",
+                "Мигание слоёв:",
+                "Быстро переключает оригинал/модифицированное для визуального поиска отличий.",
+                "",
+                "Порог чувствительности:",
+                "Позволяет скрыть слишком малые изменения и сосредоточиться на более выраженных.",
+                "",
+                "Режим «Точно»:",
+                "Строит карту по полноразмерному изображению.",
+                "Если выключен, используется быстрый preview для плавной работы на больших файлах.",
+            ]
+        ),
+    ),
+    (
+        "Метрики и риск",
+        "\n".join(
+            [
+                "PSNR (дБ):",
+                "Чем выше, тем меньше визуальная деградация после скрытия.",
+                "Обычно > 40 дБ считается очень хорошим качеством.",
+                "",
+                "MSE:",
+                "Средняя квадратичная ошибка между оригиналом и стего.",
+                "Чем ближе к нулю, тем лучше.",
+                "",
+                "SSIM:",
+                "Сходство структуры изображения (0..1).",
+                "Чем ближе к 1.0, тем изображения похожее по структуре.",
+                "",
+                "χ² (хи-квадрат) по LSB:",
+                "Проверка статистической аномалии младших битов.",
+                "Сильное отклонение может повышать вероятность обнаружения.",
+                "",
+                "Как формируется Risk:",
+                "Учитывается загрузка контейнера, статистика LSB и качество восстановления.",
+                "LOW: низкая заметность, запас ёмкости есть.",
+                "MEDIUM: заметные отклонения, приемлемо для практики.",
+                "HIGH: высокий шанс обнаружения, стоит снизить нагрузку или сменить режим.",
+                "",
+                "Как читать hotspot:",
+                "Чем ярче ячейка миникарты, тем выше средняя интенсивность изменений в этой зоне.",
+                "Клик по ячейке переносит фокус инспектора в соответствующую область изображения.",
+            ]
+        ),
+    ),
+    (
+        "Отчёты и ошибки",
+        "\n".join(
+            [
+                "Экспорт отчёта",
+                "",
+                "В окне предпросмотра доступны вкладки:",
+                "Текст — удобный читаемый отчёт для человека.",
+                "JSON — структурированные данные для автоматической обработки.",
+                "Сводка — короткий итог с ключевыми выводами.",
+                "",
+                "Экспорт архива данных (zip)",
+                "",
+                "В архив входят:",
+                "- report.json",
+                "- report.txt",
+                "- before.png",
+                "- after.png",
+                "- heatmap.png",
+                "- hotspot.png",
+                "- inspector.png",
+                "- attacks.csv",
+                "",
+                "Частые ошибки и решения",
+                "",
+                "1) «Сообщение слишком большое»",
+                "Уменьшите текст, выберите большее изображение или увеличьте «бит на канал».",
+                "",
+                "2) «Не удалось извлечь сообщение»",
+                "Проверьте пароль и убедитесь, что изображение не проходило JPEG-сжатие/редактирование.",
+                "",
+                "3) Низкая устойчивость к атакам",
+                "Снизьте загрузку контейнера, используйте 1 бит/канал, избегайте JPEG после встраивания.",
+                "",
+                "4) pyqtgraph не установлен",
+                "Графики будут открываться через резервный режим. "
+                "Для интерактива установите зависимость: pip install pyqtgraph",
+            ]
+        ),
+    ),
+)
+
+
 class HelpDialog(QDialog):
+    _LSB_PIXMAPS: Dict[float, QPixmap] = {}
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Справка")
@@ -421,191 +801,18 @@ class HelpDialog(QDialog):
         tabs = QTabWidget()
         root.addWidget(tabs, 1)
 
-        tab_data: List[tuple[str, str]] = [
-            (
-                "Быстрый старт",
-                "\n".join(
-                    [
-                        "Сценарий 1: скрыть и извлечь сообщение",
-                        "",
-                        "1. Нажмите «Открыть изображение» и выберите контейнер.",
-                        "2. В поле «Сообщение» введите текст для скрытия.",
-                        "3. Опционально заполните «Пароль»: он применяется как XOR-маска.",
-                        "4. Выберите «Бит на канал» (1, 2 или 3).",
-                        "5. Выберите «Метод сокрытия»:",
-                        "   - Последовательный (R->G->B): выше качество изображения.",
-                        "   - Чередование каналов: немного равномернее распределение изменений.",
-                        "6. Нажмите «Спрятать».",
-                        "7. После встраивания нажмите «Извлечь» для проверки.",
-                        "8. Сохраните результат: «Сохранить как...», «Экспорт отчёта», «Экспорт архива данных».",
-                        "",
-                        "Сценарий 2: только проверить чужое изображение",
-                        "",
-                        "1. Откройте файл.",
-                        "2. При необходимости введите пароль.",
-                        "3. Нажмите «Извлечь».",
-                        "4. Оцените метрики и риск в правой панели.",
-                    ]
-                ),
-            ),
-            (
-                "Панель управления",
-                "\n".join(
-                    [
-                        "Что означают элементы справа",
-                        "",
-                        "Риск:",
-                        "LOW / MEDIUM / HIGH — оценка заметности скрытия по LSB-статистике и загрузке контейнера.",
-                        "",
-                        "Загрузка контейнера:",
-                        "Показывает, какую долю доступной ёмкости занимает сообщение.",
-                        "Чем выше процент, тем выше шанс статистического обнаружения.",
-                        "",
-                        "Устойчивость к атакам:",
-                        "Итог по симуляции атак (без атаки, JPEG, resize, шум, blur).",
-                        "100% означает, что сообщение восстановилось во всех сценариях.",
-                        "",
-                        "Кнопки:",
-                        "Открыть изображение — загрузка контейнера.",
-                        "Сохранить как... — сохранить модифицированное изображение.",
-                        "Экспорт отчёта — текст/JSON отчёт с метриками.",
-                        "Экспорт архива данных — zip с артефактами анализа.",
-                        "Показать гистограмму LSB — распределение младших битов.",
-                        "До/После + Теплокарта — визуальный анализ отличий.",
-                        "Симулятор атак — проверка устойчивости к искажениям.",
-                        "Сравнить режимы — автопрогон метод × биты.",
-                        "Демо-режим — быстрый сценарий всех основных инструментов.",
-                        "",
-                        "Живая аналитика в главном окне:",
-                        "Верхняя HUD-плашка показывает процент изменённых пикселей, среднюю и максимальную дельту.",
-                        "Миникарта hotspot показывает, в каких областях изменения наиболее плотные.",
-                        "Пиксельный инспектор показывает биты канала, LSB до/после и локальную лупу.",
-                        "",
-                        "Режимы экрана:",
-                        "Базовый — показывает только основные действия без перегрузки интерфейса.",
-                        "Эксперт — открывает hotspot, инспектор, расширенный анализ и служебные инструменты.",
-                        "",
-                        "Кнопки в заголовке:",
-                        "❔ — открывает это окно справки.",
-                        "☀/🌙 — переключает тему (день/ночь) в реальном времени.",
-                    ]
-                ),
-            ),
-            (
-                "Режимы сравнения",
-                "\n".join(
-                    [
-                        "Окно «До/После + Теплокарта»",
-                        "",
-                        "Разделение:",
-                        "Показывает оригинал и модифицированную версию с вертикальным разделителем.",
-                        "Ползунок «Положение» меняет границу сравнения.",
-                        "",
-                        "Смешивание:",
-                        "Накладывает изображения друг на друга.",
-                        "Удобно для оценки глобальных изменений без резких границ.",
-                        "",
-                        "Теплокарта:",
-                        "Цветом показывает, где изменения наиболее выражены.",
-                        "Синий/холодный — малые изменения, тёплые оттенки — более сильные.",
-                        "",
-                        "Усиление ×20:",
-                        "Специальный режим для наглядного усиления малых различий LSB.",
-                        "Используется для визуальной диагностики, а не как итоговое изображение.",
-                        "",
-                        "Мигание слоёв:",
-                        "Быстро переключает оригинал/модифицированное для визуального поиска отличий.",
-                        "",
-                        "Порог чувствительности:",
-                        "Позволяет скрыть слишком малые изменения и сосредоточиться на более выраженных.",
-                        "",
-                        "Режим «Точно»:",
-                        "Строит карту по полноразмерному изображению.",
-                        "Если выключен, используется быстрый preview для плавной работы на больших файлах.",
-                    ]
-                ),
-            ),
-            (
-                "Метрики и риск",
-                "\n".join(
-                    [
-                        "PSNR (дБ):",
-                        "Чем выше, тем меньше визуальная деградация после скрытия.",
-                        "Обычно > 40 дБ считается очень хорошим качеством.",
-                        "",
-                        "MSE:",
-                        "Средняя квадратичная ошибка между оригиналом и стего.",
-                        "Чем ближе к нулю, тем лучше.",
-                        "",
-                        "SSIM:",
-                        "Сходство структуры изображения (0..1).",
-                        "Чем ближе к 1.0, тем изображения похожее по структуре.",
-                        "",
-                        "χ² (хи-квадрат) по LSB:",
-                        "Проверка статистической аномалии младших битов.",
-                        "Сильное отклонение может повышать вероятность обнаружения.",
-                        "",
-                        "Как формируется Risk:",
-                        "Учитывается загрузка контейнера, статистика LSB и качество восстановления.",
-                        "LOW: низкая заметность, запас ёмкости есть.",
-                        "MEDIUM: заметные отклонения, приемлемо для практики.",
-                        "HIGH: высокий шанс обнаружения, стоит снизить нагрузку или сменить режим.",
-                        "",
-                        "Как читать hotspot:",
-                        "Чем ярче ячейка миникарты, тем выше средняя интенсивность изменений в этой зоне.",
-                        "Клик по ячейке переносит фокус инспектора в соответствующую область изображения.",
-                    ]
-                ),
-            ),
-            (
-                "Отчёты и ошибки",
-                "\n".join(
-                    [
-                        "Экспорт отчёта",
-                        "",
-                        "В окне предпросмотра доступны вкладки:",
-                        "Текст — удобный читаемый отчёт для человека.",
-                        "JSON — структурированные данные для автоматической обработки.",
-                        "Сводка — короткий итог с ключевыми выводами.",
-                        "",
-                        "Экспорт архива данных (zip)",
-                        "",
-                        "В архив входят:",
-                        "- report.json",
-                        "- report.txt",
-                        "- before.png",
-                        "- after.png",
-                        "- heatmap.png",
-                        "- hotspot.png",
-                        "- inspector.png",
-                        "- attacks.csv",
-                        "",
-                        "Частые ошибки и решения",
-                        "",
-                        "1) «Сообщение слишком большое»",
-                        "Уменьшите текст, выберите большее изображение или увеличьте «бит на канал».",
-                        "",
-                        "2) «Не удалось извлечь сообщение»",
-                        "Проверьте пароль и убедитесь, что изображение не проходило JPEG-сжатие/редактирование.",
-                        "",
-                        "3) Низкая устойчивость к атакам",
-                        "Снизьте загрузку контейнера, используйте 1 бит/канал, избегайте JPEG после встраивания.",
-                        "",
-                        "4) pyqtgraph не установлен",
-                        "Графики будут открываться через резервный режим. "
-                        "Для интерактива установите зависимость: pip install pyqtgraph",
-                    ]
-                ),
-            ),
+        # Вкладки создаются пустыми и наполняются при первом показе.
+        builders: List[tuple[str, Callable[[], QWidget]]] = [
+            (tab_title, lambda text=tab_text: self._build_text_tab(text)) for tab_title, tab_text in _HELP_TAB_DATA
         ]
-
-        for tab_title, tab_text in tab_data:
-            text_box = QPlainTextEdit()
-            text_box.setReadOnly(True)
-            text_box.setPlainText(tab_text)
-            tabs.addTab(text_box, tab_title)
-
-        tabs.insertTab(1, self._build_lsb_tab(), "LSB подробно")
+        builders.insert(1, ("LSB подробно", self._build_lsb_tab))
+        self._tabs = tabs
+        self._tab_builders: List[Callable[[], QWidget] | None] = []
+        for tab_title, builder in builders:
+            tabs.addTab(QWidget(), tab_title)
+            self._tab_builders.append(builder)
+        tabs.currentChanged.connect(self._ensure_tab)
+        self._ensure_tab(tabs.currentIndex())
 
         close_row = QHBoxLayout()
         close_row.addStretch(1)
@@ -614,6 +821,29 @@ class HelpDialog(QDialog):
         close_row.addWidget(btn_close)
         root.addLayout(close_row)
 
+    def _ensure_tab(self, idx: int):
+        if idx < 0 or self._tab_builders[idx] is None:
+            return
+        builder = self._tab_builders[idx]
+        self._tab_builders[idx] = None
+        title = self._tabs.tabText(idx)
+        placeholder = self._tabs.widget(idx)
+        self._tabs.blockSignals(True)
+        try:
+            self._tabs.removeTab(idx)
+            placeholder.deleteLater()
+            self._tabs.insertTab(idx, builder(), title)
+            self._tabs.setCurrentIndex(idx)
+        finally:
+            self._tabs.blockSignals(False)
+
+    @staticmethod
+    def _build_text_tab(text: str) -> QWidget:
+        text_box = QPlainTextEdit()
+        text_box.setReadOnly(True)
+        text_box.setPlainText(text)
+        return text_box
+
     def _build_lsb_tab(self) -> QWidget:
         panel = QWidget()
         layout = QVBoxLayout(panel)
@@ -629,7 +859,7 @@ class HelpDialog(QDialog):
 
         diagram = QLabel()
         diagram.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        diagram.setPixmap(self._build_lsb_diagram_pixmap())
+        diagram.setPixmap(self._lsb_diagram_pixmap(self.devicePixelRatioF()))
         layout.addWidget(diagram)
 
         details = QPlainTextEdit()
@@ -671,9 +901,21 @@ class HelpDialog(QDialog):
         layout.addWidget(details, 1)
         return panel
 
-    def _build_lsb_diagram_pixmap(self) -> QPixmap:
+    @classmethod
+    def _lsb_diagram_pixmap(cls, dpr: float) -> QPixmap:
+        # Схема статична: рисуется при первом открытии справки для каждого
+        # масштаба экрана и дальше переиспользуется.
+        pixmap = cls._LSB_PIXMAPS.get(dpr)
+        if pixmap is None:
+            pixmap = cls._LSB_PIXMAPS[dpr] = cls._build_lsb_diagram_pixmap(dpr)
+        return pixmap
+
+    @staticmethod
+    def _build_lsb_diagram_pixmap(dpr: float = 1.0) -> QPixmap:
         width, height = 860, 240
-        pixmap = QPixmap(width, height)
+        # Растр в физических пикселях экрана: на HiDPI схема не растягивается при отрисовке.
+        pixmap = QPixmap(round(width * dpr), round(height * dpr))
+        pixmap.setDevicePixelRatio(dpr)
         pixmap.fill(QColor("#07263f"))
 
         p = QPainter(pixmap)
@@ -1,8 +1,27 @@
 from __future__ import annotations
 
-from PySide6.QtCore import QRectF, Qt, Signal
-from PySide6.QtGui import QColor, QPainter, QPen, QPixmap
-from PySide6.QtWidgets import QGraphicsLineItem, QGraphicsPixmapItem, QGraphicsScene, QGraphicsView
+import os
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image
+from PySide6.QtCore import QObject, QPoint, QPointF, QRectF, QRunnable, Qt, QThreadPool, QTimer, Signal
+from PySide6.QtGui import QColor, QImage, QOpenGLContext, QPainter, QPen, QPixmap, QPixmapCache, QRegion, QTransform
+from PySide6.QtWidgets import QGraphicsPixmapItem, QGraphicsScene, QGraphicsView
+
+from ui_qt.image_utils import ndarray_to_pixmap, pil_to_pixmap, pil_to_qimage
+
+try:
+    from PySide6.QtOpenGLWidgets import QOpenGLWidget
+except Exception:  # pragma: no cover - optional dependency at runtime
+    QOpenGLWidget = None
+
+@lru_cache(maxsize=1)
+def _opengl_viewport_enabled() -> bool:
+    # STEGO_OPENGL=0 отключает GPU-вьюпорт на системах с проблемными драйверами.
+    if QOpenGLWidget is None or os.environ.get("STEGO_OPENGL", "1").strip() == "0":
+        return False
+    return QOpenGLContext().create()
 
 
 class ImageGraphicsView(QGraphicsView):
@@ -12,35 +31,77 @@ class ImageGraphicsView(QGraphicsView):
     def __init__(self, parent=None):
         super().__init__(parent)
         self._scene = QGraphicsScene(self)
+        # В сцене один элемент (pixmap): BSP-индекс для поиска элементов только мешает.
+        self._scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
         self.setScene(self._scene)
+        # Состояние painter сохраняет сам drawForeground; запас под сглаживание
+        # заложен в _probe_region.
+        self.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontSavePainterState, True)
+        self.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontAdjustForAntialiasing, True)
         self._pixmap_item = QGraphicsPixmapItem()
         self._scene.addItem(self._pixmap_item)
-        self._cross_v = QGraphicsLineItem()
-        self._cross_h = QGraphicsLineItem()
-        pen = QPen(QColor("#ffd166"))
-        pen.setWidth(1)
-        self._cross_v.setPen(pen)
-        self._cross_h.setPen(pen)
-        self._cross_v.setZValue(3)
-        self._cross_h.setZValue(3)
-        self._scene.addItem(self._cross_v)
-        self._scene.addItem(self._cross_h)
-        self._cross_v.hide()
-        self._cross_h.hide()
+        # Перекрестие пробы рисуется в drawForeground, а не элементами сцены:
+        # движение пробы не трогает индекс сцены и перерисовывает лишь полосы линий.
+        self._probe: tuple[int, int] | None = None
+        self._probe_pen = QPen(QColor("#ffd166"))
+        self._probe_pen.setWidth(1)
+        if _opengl_viewport_enabled():
+            # Масштабирование и сглаживание pixmap выполняет GPU; GL-вьюпорт
+            # перерисовывается только целиком.
+            self.setViewport(QOpenGLWidget())
+            self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.FullViewportUpdate)
         self.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, True)
         self.setRenderHint(QPainter.RenderHint.Antialiasing, True)
-        self.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
+        # Панорамирование ведётся вручную через полосы прокрутки: ScrollHandDrag
+        # прогоняет каждое движение через машину состояний drag и сцену.
+        self.setDragMode(QGraphicsView.DragMode.NoDrag)
+        self.viewport().setCursor(Qt.CursorShape.OpenHandCursor)
+        self._pan_anchor: QPoint | None = None
         self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
         self.setResizeAnchor(QGraphicsView.ViewportAnchor.AnchorViewCenter)
         self._has_image = False
         self._base_rect = QRectF()
         self.setMouseTracking(True)
+        # Наведение схлопывается до одного сигнала за кадр (~16 мс) с последней точкой.
+        self._pending_hover: tuple[int, int] | None = None
+        # Последний отправленный пиксель: субпиксельные движения сигнал не повторяют.
+        self._last_hover: tuple[int, int] | None = None
+        self._hover_timer = QTimer(self)
+        self._hover_timer.setSingleShot(True)
+        self._hover_timer.setInterval(16)
+        self._hover_timer.timeout.connect(self._flush_hover)
+        # Шаги колеса копятся и применяются одним scale() за проход цикла событий.
+        self._pending_zoom = 1.0
+        self._zoom_timer = QTimer(self)
+        self._zoom_timer.setSingleShot(True)
+        self._zoom_timer.setInterval(0)
+        self._zoom_timer.timeout.connect(self._apply_zoom)
+        # Номер последнего запрошенного изображения: устаревшие фоновые результаты отбрасываются.
+        self._image_token = 0
+        self._image_workers: dict[int, _QImageWorker] = {}
+        # Масштаб «вписать» кэшируется по размерам изображения и вьюпорта; пока
+        # пользователь не масштабировал колесом, ресайз окна вписывает заново.
+        self._fit_key: tuple[float, float, int, int] | None = None
+        self._fit_scale = 1.0
+        self._fitted = False
+        self._fit_timer = QTimer(self)
+        self._fit_timer.setSingleShot(True)
+        self._fit_timer.setInterval(16)
+        self._fit_timer.timeout.connect(self._refit)
+        # Во время зума и панорамирования pixmap рисуется без билинейной фильтрации
+        # (ценой лёгкой «лесенки» в движении); сглаживание возвращается через 150 мс покоя.
+        self._motion_timer = QTimer(self)
+        self._motion_timer.setSingleShot(True)
+        self._motion_timer.setInterval(150)
+        self._motion_timer.timeout.connect(self._settle_motion)
 
     def set_pixmap(self, pixmap: QPixmap | None) -> None:
+        self._image_token += 1
         if pixmap is None or pixmap.isNull():
             self._pixmap_item.setPixmap(QPixmap())
             self._scene.setSceneRect(QRectF())
             self._has_image = False
+            self._fitted = False
             self.clear_probe_point()
             self.viewport().update()
             return
@@ -49,48 +110,201 @@ class ImageGraphicsView(QGraphicsView):
         self._scene.setSceneRect(rect)
         self._base_rect = rect
         self._has_image = True
-        self.resetTransform()
-        self.fitInView(self._base_rect, Qt.AspectRatioMode.KeepAspectRatio)
+        self._pending_zoom = 1.0
+        self._last_hover = None
+        if self._probe is not None:
+            # Точка могла оказаться вне нового изображения: приводим её к его границам.
+            probe, self._probe = self._probe, None
+            self.set_probe_point(*probe)
+        self._fit_to_view()
+
+    def _fit_to_view(self) -> None:
+        # То же, что fitInView(KeepAspectRatio) с его полем 2 px, но без пересчёта
+        # масштаба при повторных вызовах с теми же размерами.
+        vp = self.viewport().size()
+        key = (self._base_rect.width(), self._base_rect.height(), vp.width(), vp.height())
+        if key != self._fit_key:
+            view_w, view_h = vp.width() - 4, vp.height() - 4
+            if view_w <= 0 or view_h <= 0:
+                self.resetTransform()
+                self._fitted = True
+                return
+            self._fit_key = key
+            self._fit_scale = min(view_w / key[0], view_h / key[1])
+        self.setTransform(QTransform.fromScale(self._fit_scale, self._fit_scale))
+        self.centerOn(self._base_rect.center())
+        self._fitted = True
+
+    def _refit(self) -> None:
+        if self._has_image and self._fitted:
+            self._fit_to_view()
+
+    def set_image(self, image: Image.Image | np.ndarray, cache_key: str | None = None) -> None:
+        """Показывает PIL-изображение или массив (H, W, 3) uint8; по ключу содержимого pixmap берётся из QPixmapCache."""
+        to_pixmap = ndarray_to_pixmap if isinstance(image, np.ndarray) else pil_to_pixmap
+        if cache_key is None:
+            self.set_pixmap(to_pixmap(image))
+            return
+        pixmap = QPixmapCache.find(cache_key)
+        if pixmap is None:
+            pixmap = to_pixmap(image)
+            QPixmapCache.insert(cache_key, pixmap)
+        self.set_pixmap(pixmap)
+
+    def set_image_async(self, image: Image.Image, cache_key: str | None = None) -> None:
+        """Как set_image, но PIL → QImage выполняется в пуле потоков; в GUI-потоке — только QPixmap."""
+        if cache_key is not None:
+            pixmap = QPixmapCache.find(cache_key)
+            if pixmap is not None:
+                self.set_pixmap(pixmap)
+                return
+        self._image_token += 1
+        worker = _QImageWorker(image, cache_key, self._image_token)
+        worker.signals.result.connect(self._on_image_decoded)
+        self._image_workers[self._image_token] = worker
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_image_decoded(self, qimg: QImage, cache_key: str | None, token: int) -> None:
+        self._image_workers.pop(token, None)
+        if token != self._image_token:
+            return
+        pixmap = QPixmap.fromImage(qimg)
+        if cache_key is not None:
+            QPixmapCache.insert(cache_key, pixmap)
+        self.set_pixmap(pixmap)
 
     def wheelEvent(self, event):
         if not self._has_image:
             return super().wheelEvent(event)
-        factor = 1.15 if event.angleDelta().y() > 0 else 0.87
-        self.scale(factor, factor)
+        self._pending_zoom *= 1.15 if event.angleDelta().y() > 0 else 0.87
+        self._begin_motion()
+        if not self._zoom_timer.isActive():
+            self._zoom_timer.start()
+
+    def _apply_zoom(self) -> None:
+        factor, self._pending_zoom = self._pending_zoom, 1.0
+        if self._has_image and factor != 1.0:
+            self._fitted = False
+            self.scale(factor, factor)
+
+    def _begin_motion(self) -> None:
+        if self.renderHints() & QPainter.RenderHint.SmoothPixmapTransform:
+            self.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, False)
+        self._motion_timer.start()
+
+    def _settle_motion(self) -> None:
+        if self._pan_anchor is not None:
+            # Кнопка ещё зажата: сглаживание вернёт отпускание.
+            return
+        self.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, True)
+        self.viewport().update()
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        if self._has_image and self.transform().isIdentity():
-            self.fitInView(self._base_rect, Qt.AspectRatioMode.KeepAspectRatio)
+        # Серия ресайзов при перетаскивании края окна вписывается один раз за кадр.
+        if self._has_image and self._fitted and not self._fit_timer.isActive():
+            self._fit_timer.start()
 
     def mousePressEvent(self, event):
         if self._has_image:
             point = self._scene_point(event.position())
             if point is not None:
                 self.pixelClicked.emit(point[0], point[1])
+            if event.button() == Qt.MouseButton.LeftButton:
+                # Режим движения включает только реальный сдвиг: простой клик
+                # выбирает пиксель и не должен сбрасывать сглаживание.
+                self._pan_anchor = event.position().toPoint()
+                self.viewport().setCursor(Qt.CursorShape.ClosedHandCursor)
+                event.accept()
+                return
         super().mousePressEvent(event)
 
+    def mouseReleaseEvent(self, event):
+        if self._pan_anchor is not None and event.button() == Qt.MouseButton.LeftButton:
+            self._pan_anchor = None
+            if not self.renderHints() & QPainter.RenderHint.SmoothPixmapTransform:
+                self._motion_timer.start()
+            self.viewport().setCursor(Qt.CursorShape.OpenHandCursor)
+            event.accept()
+            return
+        super().mouseReleaseEvent(event)
+
     def mouseMoveEvent(self, event):
+        if self._pan_anchor is not None:
+            pos = event.position().toPoint()
+            delta = pos - self._pan_anchor
+            self._pan_anchor = pos
+            if delta.isNull():
+                event.accept()
+                return
+            if self.renderHints() & QPainter.RenderHint.SmoothPixmapTransform:
+                self._begin_motion()
+            hbar = self.horizontalScrollBar()
+            hbar.setValue(hbar.value() + (delta.x() if self.isRightToLeft() else -delta.x()))
+            self.verticalScrollBar().setValue(self.verticalScrollBar().value() - delta.y())
+            event.accept()
+            return
         if self._has_image:
             point = self._scene_point(event.position())
             if point is not None:
-                self.pixelHovered.emit(point[0], point[1])
+                self._pending_hover = point
+                if point != self._last_hover and not self._hover_timer.isActive():
+                    self._hover_timer.start()
         super().mouseMoveEvent(event)
 
+    def leaveEvent(self, event):
+        self._last_hover = None
+        super().leaveEvent(event)
+
+    def _flush_hover(self) -> None:
+        point, self._pending_hover = self._pending_hover, None
+        if point is not None and point != self._last_hover and self._has_image:
+            self._last_hover = point
+            self.pixelHovered.emit(point[0], point[1])
+
     def set_probe_point(self, x: int, y: int) -> None:
         if not self._has_image:
             self.clear_probe_point()
             return
         px = max(0, min(int(x), int(self._base_rect.width()) - 1))
         py = max(0, min(int(y), int(self._base_rect.height()) - 1))
-        self._cross_v.setLine(px, 0, px, self._base_rect.height())
-        self._cross_h.setLine(0, py, self._base_rect.width(), py)
-        self._cross_v.show()
-        self._cross_h.show()
+        previous = self._probe
+        if previous == (px, py):
+            return
+        self._probe = (px, py)
+        # Старое и новое перекрестие перерисовываются одним обновлением вьюпорта.
+        region = self._probe_region(self._probe)
+        if previous is not None:
+            region |= self._probe_region(previous)
+        self.viewport().update(region)
 
     def clear_probe_point(self) -> None:
-        self._cross_v.hide()
-        self._cross_h.hide()
+        if self._probe is None:
+            return
+        region = self._probe_region(self._probe)
+        self._probe = None
+        self.viewport().update(region)
+
+    def drawForeground(self, painter: QPainter, rect: QRectF) -> None:
+        super().drawForeground(painter, rect)
+        if self._probe is None:
+            return
+        px, py = self._probe
+        painter.save()
+        painter.setPen(self._probe_pen)
+        painter.drawLine(QPointF(px, 0), QPointF(px, self._base_rect.height()))
+        painter.drawLine(QPointF(0, py), QPointF(self._base_rect.width(), py))
+        painter.restore()
+
+    def _probe_region(self, probe: tuple[int, int]) -> QRegion:
+        """Экранные полосы линий перекрестия: объединение двух узких прямоугольников."""
+        px, py = probe
+        w, h = self._base_rect.width(), self._base_rect.height()
+        # Запас в пиксель сцены покрывает ширину пера и сглаживание при любом масштабе.
+        region = QRegion()
+        for band in (QRectF(px - 1, -1, 2, h + 2), QRectF(-1, py - 1, w + 2, 2)):
+            region |= QRegion(self.mapFromScene(band).boundingRect().adjusted(-2, -2, 2, 2))
+        return region
 
     def center_on_pixel(self, x: int, y: int) -> None:
         if not self._has_image:
@@ -103,3 +317,20 @@ class ImageGraphicsView(QGraphicsView):
         if not self._base_rect.contains(mapped):
             return None
         return int(mapped.x()), int(mapped.y())
+
+
+class _QImageWorkerSignals(QObject):
+    result = Signal(object, object, int)
+
+
+class _QImageWorker(QRunnable):
+    def __init__(self, image: Image.Image, cache_key: str | None, token: int):
+        super().__init__()
+        self.signals = _QImageWorkerSignals()
+        self.image = image
+        self.cache_key = cache_key
+        self.token = token
+
+    def run(self):
+        # QImage можно строить вне GUI-потока, QPixmap — нельзя.
+        self.signals.result.emit(pil_to_qimage(self.image), self.cache_key, self.token)
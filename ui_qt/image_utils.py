@@ -1,25 +1,75 @@
 from __future__ import annotations
 
-from io import BytesIO
+import sys
 
+import numpy as np
 from PIL import Image
 from PySide6.QtGui import QImage, QPixmap
 
 
 def pil_to_qimage(image: Image.Image) -> QImage:
-    rgb = image.convert("RGB")
-    data = rgb.tobytes("raw", "RGB")
-    qimg = QImage(data, rgb.width, rgb.height, rgb.width * 3, QImage.Format.Format_RGB888)
+    qimg, _data = _wrap_rgb888(image)
+    # Возвращаемый QImage переживает буфер data, поэтому пиксели копируются.
     return qimg.copy()
 
 
 def pil_to_pixmap(image: Image.Image) -> QPixmap:
-    return QPixmap.fromImage(pil_to_qimage(image))
+    # fromImage сам копирует пиксели, пока data жив в этой области: .copy() не нужен.
+    qimg, _data = _wrap_rgb888(image)
+    return QPixmap.fromImage(qimg)
+
+
+def _wrap_rgb888(image: Image.Image) -> tuple[QImage, bytes]:
+    """QImage поверх байтов изображения без копии; буфер возвращается вызывающему для удержания."""
+    rgb = image if image.mode == "RGB" else image.convert("RGB")
+    # Каждый вызов выделяет новые 3*W*H байт: у публичного API Pillow нет записи
+    # в готовый буфер, а np.asarray(rgb) тоже копирует пиксели через tobytes().
+    data = rgb.tobytes()
+    return QImage(data, rgb.width, rgb.height, rgb.width * 3, QImage.Format.Format_RGB888), data
+
+
+def ndarray_to_qimage(arr: np.ndarray) -> QImage:
+    """QImage из массива (H, W, 3) или (H, W, 4) uint8 без промежуточного PIL-изображения."""
+    qimg, _arr = _wrap_ndarray(arr)
+    return qimg.copy()
+
+
+def ndarray_to_pixmap(arr: np.ndarray) -> QPixmap:
+    """QPixmap из массива (H, W, 3) или (H, W, 4) uint8 без промежуточного PIL-изображения."""
+    # QImage лишь ссылается на буфер массива; fromImage копирует пиксели в pixmap.
+    qimg, _arr = _wrap_ndarray(arr)
+    return QPixmap.fromImage(qimg)
+
+
+def _wrap_ndarray(arr: np.ndarray) -> tuple[QImage, np.ndarray]:
+    arr = np.ascontiguousarray(arr, dtype=np.uint8)
+    h, w, channels = arr.shape
+    fmt = QImage.Format.Format_RGBA8888 if channels == 4 else QImage.Format.Format_RGB888
+    return QImage(arr.data, w, h, arr.strides[0], fmt), arr
 
 
 def pixmap_to_pil(pixmap: QPixmap) -> Image.Image:
-    buffer = BytesIO()
-    qimg = pixmap.toImage().convertToFormat(QImage.Format.Format_RGB888)
-    ptr = qimg.bits()
-    arr = bytes(ptr[: qimg.width() * qimg.height() * 3])
-    return Image.frombytes("RGB", (qimg.width(), qimg.height()), arr)
+    qimg = pixmap.toImage()
+    if qimg.format() == QImage.Format.Format_RGB32:
+        # Родной формат непрозрачного pixmap: PIL распаковывает 32-битные пиксели
+        # сам, без отдельного прохода convertToFormat внутри Qt.
+        return _qimage_to_pil(qimg, "RGB", _RGB32_RAW)
+    return _qimage_to_pil(qimg.convertToFormat(QImage.Format.Format_RGB888), "RGB", "RGB")
+
+
+def pixmap_to_pil_rgba(pixmap: QPixmap) -> Image.Image:
+    qimg = pixmap.toImage()
+    if qimg.format() != QImage.Format.Format_RGBA8888:
+        qimg = qimg.convertToFormat(QImage.Format.Format_RGBA8888)
+    return _qimage_to_pil(qimg, "RGBA", "RGBA")
+
+
+def _qimage_to_pil(qimg: QImage, mode: str, raw_mode: str) -> Image.Image:
+    # Строки QImage выровнены по 4 байта: шаг берётся из bytesPerLine, а не w * bpp.
+    # constBits() не отделяет общий буфер, bytes() копирует его одним memcpy.
+    data = bytes(qimg.constBits())
+    return Image.frombuffer(mode, (qimg.width(), qimg.height()), data, "raw", raw_mode, qimg.bytesPerLine(), 1)
+
+
+# Format_RGB32 хранит 0xffRRGGBB в порядке байтов платформы.
+_RGB32_RAW = "BGRX" if sys.byteorder == "little" else "XRGB"
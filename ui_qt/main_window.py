@@ -2,6 +2,9 @@ from __future__ import annotations
 
 import hashlib
 import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError
 from io import BytesIO
 from pathlib import Path
 from typing import Any, Dict, List
@@ -35,12 +38,13 @@ from skimage.metrics import mean_squared_error as mse
 from skimage.metrics import peak_signal_noise_ratio as psnr
 from skimage.metrics import structural_similarity as ssim
 
+from core._imgutil import pil_to_np
 from core.analysis import run_attack_suite, run_mode_benchmark
 from core.proof_pack import export_proof_pack
 from core.report import build_stegano_report
 from core.risk import chi_square_lsb_test, evaluate_risk
 from core.stego import decode_text_from_image, encode_text_into_image, max_message_bytes
-from core.visual_analysis import build_analysis_preview, probe_pixel
+from core.visual_analysis import build_analysis_preview, build_analysis_preview_array, probe_pixel, rgb_array
 from ui_qt.dialogs import (
     AttackLabDialog,
     BenchmarkDialog,
@@ -51,7 +55,6 @@ from ui_qt.dialogs import (
     ReportPreviewDialog,
 )
 from ui_qt.graphics_view import ImageGraphicsView
-from ui_qt.image_utils import pil_to_pixmap
 from ui_qt.strings import STRINGS
 from ui_qt.theme import build_stylesheet, get_tokens
 from ui_qt.widgets import HotspotMapWidget, PixelInspectorWidget
@@ -60,6 +63,7 @@ from ui_qt.widgets import HotspotMapWidget, PixelInspectorWidget
 class _AnalysisWorkerSignals(QObject):
     result = Signal(object)
     error = Signal(str)
+    cancelled = Signal(int)
 
 
 class _AnalysisWorker(QRunnable):
@@ -74,34 +78,59 @@ class _AnalysisWorker(QRunnable):
         exact: bool,
         preview_limit: int,
         amplify: int = 20,
+        sources: tuple[Image.Image, Image.Image] | None = None,
     ):
         super().__init__()
+        # Временем жизни управляет окно через _analysis_workers: пул не удаляет
+        # воркер после run, поэтому tryTake к нему безопасен в любой момент.
+        self.setAutoDelete(False)
         self.signals = _AnalysisWorkerSignals()
         self.request_id = request_id
-        self.original = original.copy().convert("RGB")
-        self.modified = modified.copy().convert("RGB")
+        # Уменьшенная пара от прошлого прогона делает исходники ненужными. Сами
+        # исходники не копируются: окно не меняет их после загрузки и встраивания,
+        # а один и тот же объект попадает в кэш массивов ядра анализа.
+        self.sources = None if exact else sources
+        if self.sources is None:
+            self.original = original if original.mode == "RGB" else original.convert("RGB")
+            self.modified = modified if modified.mode == "RGB" else modified.convert("RGB")
         self.mode = mode
         self.threshold = threshold
         self.split_ratio = split_ratio
         self.exact = exact
         self.preview_limit = preview_limit
         self.amplify = amplify
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
 
     def run(self):
         try:
-            original = self.original
-            modified = self.modified
-            if not self.exact:
-                original = _downscale_for_preview(original, self.preview_limit)
-                modified = _downscale_for_preview(modified, self.preview_limit)
-            preview, delta_map, stats, hotspot = build_analysis_preview(
+            if self._cancelled.is_set():
+                raise CancelledError()
+            if self.sources is not None:
+                original, modified = self.sources
+            else:
+                original = self.original
+                modified = self.modified
+                if not self.exact:
+                    original = _downscale_for_preview(original, self.preview_limit)
+                    modified = _downscale_for_preview(modified, self.preview_limit)
+            # Превью остаётся массивом RGB888: GUI-поток оборачивает его в QImage без копии через PIL.
+            preview, delta_map, stats, hotspot = build_analysis_preview_array(
                 original,
                 modified,
                 mode=self.mode,
                 threshold=self.threshold,
                 split_ratio=self.split_ratio,
                 amplify=self.amplify,
+                should_continue=lambda: not self._cancelled.is_set(),
             )
+            # Массивы уходят в GUI-поток и в кэш по ссылке, без копий; запрет записи
+            # гарантирует, что закэшированный результат никто не изменит на месте.
+            # Переиспользовать буферы между прогонами нельзя: их держит кэш анализа.
+            for arr in (preview, delta_map, hotspot):
+                arr.setflags(write=False)
             self.signals.result.emit(
                 {
                     "request_id": self.request_id,
@@ -109,20 +138,38 @@ class _AnalysisWorker(QRunnable):
                     "delta_map": delta_map,
                     "stats": stats,
                     "hotspot": hotspot,
-                    "preview_size": preview.size,
+                    "preview_size": (preview.shape[1], preview.shape[0]),
                     "exact": self.exact,
+                    "sources": None if self.exact else (original, modified),
                 }
             )
+        except CancelledError:
+            self.signals.cancelled.emit(self.request_id)
         except Exception as exc:
             self.signals.error.emit(str(exc))
 
 
+# Длинная сторона изображений, по которым строится быстрый (не full-res) анализ.
+_PREVIEW_LIMIT = 1600
+# Бюджет кэша результатов анализа: превью, карта дельт и сетка горячих зон.
+_ANALYSIS_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def _payload_nbytes(payload: Dict[str, Any]) -> int:
+    preview = payload["preview"]
+    if isinstance(preview, Image.Image):
+        preview_bytes = preview.width * preview.height * len(preview.getbands())
+    else:
+        preview_bytes = preview.nbytes
+    return preview_bytes + payload["delta_map"].nbytes + payload["hotspot"].nbytes
+
+
 def _downscale_for_preview(image: Image.Image, max_side: int) -> Image.Image:
     max_side = max(256, int(max_side))
     w, h = image.size
     longest = max(w, h)
     if longest <= max_side:
-        return image.copy()
+        return image
     scale = max_side / float(longest)
     size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
     return image.resize(size, Image.Resampling.BILINEAR)
@@ -133,6 +180,7 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.theme_mode = "dark"
         self.tokens = get_tokens(self.theme_mode)
+        self._placeholders: Dict[tuple[str, str], QPixmap] = {}
         self.setWindowTitle(STRINGS["app_title"])
         self.resize(1320, 920)
         self.setMinimumSize(1120, 820)
@@ -147,7 +195,12 @@ class MainWindow(QMainWindow):
         self.ui_mode = "basic"
         self.analysis_mode = "split"
         self.analysis_request_id = 0
-        self.analysis_cache: dict[tuple[Any, ...], dict[str, Any]] = {}
+        # LRU по параметрам анализа, ограниченный _ANALYSIS_CACHE_BYTES.
+        self.analysis_cache: OrderedDict[tuple[Any, ...], dict[str, Any]] = OrderedDict()
+        self._analysis_cache_bytes = 0
+        # Уменьшенная пара (оригинал, стего) для быстрого анализа: от движения
+        # ползунков она не зависит и переиспользуется до смены изображений.
+        self._preview_sources: tuple[tuple[str, str], tuple[Image.Image, Image.Image]] | None = None
         self.analysis_delta_map = None
         self.analysis_hotspot = None
         self.analysis_exact = False
@@ -261,6 +314,7 @@ class MainWindow(QMainWindow):
         self.analysis_split_slider.setValue(50)
         self.analysis_split_slider.setToolTip("Граница разделения или коэффициент смешивания.")
         self.analysis_split_slider.valueChanged.connect(self._schedule_visual_refresh)
+        self.analysis_split_slider.sliderReleased.connect(self._schedule_visual_refresh)
         controls_row.addWidget(self.analysis_split_slider, 1)
         controls_row.addWidget(QLabel("Порог"))
         self.analysis_threshold_slider = QSlider(Qt.Orientation.Horizontal)
@@ -268,6 +322,7 @@ class MainWindow(QMainWindow):
         self.analysis_threshold_slider.setValue(0)
         self.analysis_threshold_slider.setToolTip("Отсекает очень малые различия при построении карты изменений.")
         self.analysis_threshold_slider.valueChanged.connect(self._schedule_visual_refresh)
+        self.analysis_threshold_slider.sliderReleased.connect(self._schedule_visual_refresh)
         controls_row.addWidget(self.analysis_threshold_slider, 1)
         self.analysis_threshold_label = QLabel("0")
         controls_row.addWidget(self.analysis_threshold_label)
@@ -511,15 +566,20 @@ class MainWindow(QMainWindow):
         self.btn_benchmark.setEnabled(enabled)
 
     def _show_placeholder(self, view: ImageGraphicsView, text: str):
-        pix = QPixmap(720, 520)
-        pix.fill(QColor(self.tokens["canvas"]))
-        painter = QPainter(pix)
-        painter.setPen(QColor(self.tokens["muted"]))
-        f = QFont("Segoe UI", 14)
-        f.setBold(True)
-        painter.setFont(f)
-        painter.drawText(pix.rect(), Qt.AlignmentFlag.AlignCenter, text)
-        painter.end()
+        # Заглушки рисуются один раз на тему: сброс аналитики вызывает это часто.
+        key = (self.theme_mode, text)
+        pix = self._placeholders.get(key)
+        if pix is None:
+            pix = QPixmap(720, 520)
+            pix.fill(QColor(self.tokens["canvas"]))
+            painter = QPainter(pix)
+            painter.setPen(QColor(self.tokens["muted"]))
+            f = QFont("Segoe UI", 14)
+            f.setBold(True)
+            painter.setFont(f)
+            painter.drawText(pix.rect(), Qt.AlignmentFlag.AlignCenter, text)
+            painter.end()
+            self._placeholders[key] = pix
         view.set_pixmap(pix)
 
     def _set_ui_mode(self, mode: str):
@@ -542,6 +602,9 @@ class MainWindow(QMainWindow):
 
     def _schedule_visual_refresh(self):
         self.analysis_threshold_label.setText(str(self.analysis_threshold_slider.value()))
+        # Пока ползунок тянут, пересчёт реже; отпускание перезапускает таймер с коротким интервалом.
+        dragging = self.analysis_split_slider.isSliderDown() or self.analysis_threshold_slider.isSliderDown()
+        self.analysis_refresh_timer.setInterval(120 if dragging else 55)
         self.analysis_refresh_timer.start()
 
     def _refresh_visual_analysis(self):
@@ -550,6 +613,7 @@ class MainWindow(QMainWindow):
             return
         self.analysis_request_id += 1
         request_id = self.analysis_request_id
+        self._cancel_analysis_workers()
         key = (
             self.image_signature,
             self.encoded_signature,
@@ -559,10 +623,14 @@ class MainWindow(QMainWindow):
             self.btn_exact_preview.isChecked(),
         )
         if key in self.analysis_cache:
-            self._apply_visual_result(self.analysis_cache[key])
+            self.analysis_cache.move_to_end(key)
+            self._apply_visual_result(self.analysis_cache[key], pixmap_key=f"analysis:{key!r}")
             return
 
         self.analysis_hint.setText("Пересчёт визуальной аналитики...")
+        sources = None
+        if self._preview_sources is not None and self._preview_sources[0] == key[:2]:
+            sources = self._preview_sources[1]
         worker = _AnalysisWorker(
             request_id=request_id,
             original=self.image,
@@ -571,26 +639,59 @@ class MainWindow(QMainWindow):
             threshold=self.analysis_threshold_slider.value(),
             split_ratio=self.analysis_split_slider.value() / 100.0,
             exact=self.btn_exact_preview.isChecked(),
-            preview_limit=1600,
+            preview_limit=_PREVIEW_LIMIT,
+            sources=sources,
         )
         self._analysis_workers.append(worker)
         worker.signals.result.connect(lambda payload, cache_key=key: self._handle_analysis_result(cache_key, payload))
-        worker.signals.error.connect(self._handle_analysis_error)
+        worker.signals.error.connect(
+            lambda message, request_id=request_id: self._handle_analysis_error(request_id, message)
+        )
+        worker.signals.cancelled.connect(self._forget_analysis_worker)
         self.thread_pool.start(worker)
 
+    def _cancel_analysis_workers(self):
+        # Результаты прежних запросов всё равно отбрасываются: ещё не начатые
+        # снимаются с очереди пула, запущенные прерываются между этапами.
+        for worker in self._analysis_workers:
+            worker.cancel()
+        self._analysis_workers = [w for w in self._analysis_workers if not self.thread_pool.tryTake(w)]
+
+    def _forget_analysis_worker(self, request_id: int):
+        self._analysis_workers = [w for w in self._analysis_workers if w.request_id != request_id]
+
     def _handle_analysis_result(self, cache_key, payload):
         self._analysis_workers = [w for w in self._analysis_workers if w.request_id != payload.get("request_id")]
+        sources = payload.pop("sources", None)
+        if sources is not None and cache_key[:2] == (self.image_signature, self.encoded_signature):
+            self._preview_sources = (cache_key[:2], sources)
         if payload.get("request_id") != self.analysis_request_id:
             return
-        self.analysis_cache[cache_key] = payload
-        self._apply_visual_result(payload)
+        self._store_analysis_result(cache_key, payload)
+        self._apply_visual_result(payload, pixmap_key=f"analysis:{cache_key!r}")
 
-    def _handle_analysis_error(self, message: str):
-        self._analysis_workers.clear()
+    def _store_analysis_result(self, cache_key, payload: Dict[str, Any]):
+        previous = self.analysis_cache.pop(cache_key, None)
+        if previous is not None:
+            self._analysis_cache_bytes -= _payload_nbytes(previous)
+        self.analysis_cache[cache_key] = payload
+        self._analysis_cache_bytes += _payload_nbytes(payload)
+        # Самая свежая запись остаётся, даже если одна превышает бюджет.
+        while self._analysis_cache_bytes > _ANALYSIS_CACHE_BYTES and len(self.analysis_cache) > 1:
+            _key, evicted = self.analysis_cache.popitem(last=False)
+            self._analysis_cache_bytes -= _payload_nbytes(evicted)
+
+    def _clear_analysis_cache(self):
+        self.analysis_cache.clear()
+        self._analysis_cache_bytes = 0
+
+    def _handle_analysis_error(self, request_id: int, message: str):
+        # Остальные воркеры могут ещё работать: без autoDelete их держит только этот список.
+        self._forget_analysis_worker(request_id)
         self.analysis_hint.setText(f"Аналитика недоступна: {message}")
 
-    def _apply_visual_result(self, payload: Dict[str, Any]):
-        self.analysis_view.set_pixmap(pil_to_pixmap(payload["preview"]))
+    def _apply_visual_result(self, payload: Dict[str, Any], pixmap_key: str | None = None):
+        self.analysis_view.set_image(payload["preview"], pixmap_key)
         self.analysis_delta_map = payload["delta_map"]
         self.analysis_hotspot = payload["hotspot"]
         self.analysis_preview_size = tuple(payload.get("preview_size", (0, 0)))
@@ -650,8 +751,10 @@ class MainWindow(QMainWindow):
             return
         point = self._clamp_point(x, y)
         self.current_probe_point = point
-        probe = probe_pixel(self.image, self.encoded_image, point[0], point[1])
-        self.pixel_inspector.set_probe_data(probe, self.image, self.encoded_image)
+        orig = self._rgb_array(self.image)
+        mod = self._rgb_array(self.encoded_image)
+        probe = probe_pixel(orig, mod, point[0], point[1])
+        self.pixel_inspector.set_probe_data(probe, orig, mod)
         self.original_view.set_probe_point(point[0], point[1])
         self.modified_view.set_probe_point(point[0], point[1])
         ax, ay = self._analysis_point_from_original(point[0], point[1])
@@ -692,15 +795,17 @@ class MainWindow(QMainWindow):
         if self.analysis_hotspot is None or self.image is None:
             return
         rows, cols = self.analysis_hotspot.shape
-        col = min(cols - 1, max(0, int(x * cols / max(1, self.image.width))))
-        row = min(rows - 1, max(0, int(y * rows / max(1, self.image.height))))
+        w, h = self.image.size
+        col = min(cols - 1, max(0, int(x * cols / max(1, w))))
+        row = min(rows - 1, max(0, int(y * rows / max(1, h))))
         self.hotspot_map.set_selected(row, col)
 
     def _clamp_point(self, x: int, y: int) -> tuple[int, int]:
         if self.image is None:
             return 0, 0
-        px = max(0, min(int(x), self.image.width - 1))
-        py = max(0, min(int(y), self.image.height - 1))
+        w, h = self.image.size
+        px = max(0, min(int(x), w - 1))
+        py = max(0, min(int(y), h - 1))
         return px, py
 
     def _analysis_point_from_original(self, x: int, y: int) -> tuple[int, int]:
@@ -709,8 +814,9 @@ class MainWindow(QMainWindow):
         pw, ph = self.analysis_preview_size
         if pw <= 0 or ph <= 0:
             return x, y
-        ax = int(round(x * pw / max(1, self.image.width)))
-        ay = int(round(y * ph / max(1, self.image.height)))
+        w, h = self.image.size
+        ax = int(round(x * pw / max(1, w)))
+        ay = int(round(y * ph / max(1, h)))
         return max(0, min(ax, pw - 1)), max(0, min(ay, ph - 1))
 
     def _original_point_from_analysis(self, x: int, y: int) -> tuple[int, int]:
@@ -719,17 +825,24 @@ class MainWindow(QMainWindow):
         pw, ph = self.analysis_preview_size
         if pw <= 0 or ph <= 0:
             return self._clamp_point(x, y)
-        ox = int(round(x * self.image.width / max(1, pw)))
-        oy = int(round(y * self.image.height / max(1, ph)))
+        w, h = self.image.size
+        ox = int(round(x * w / max(1, pw)))
+        oy = int(round(y * h / max(1, ph)))
         return self._clamp_point(ox, oy)
 
     def _image_signature(self, image: Image.Image | None) -> str:
         if image is None:
             return "none"
-        arr = np.array(image.convert("RGB"), dtype=np.uint8)
-        digest = hashlib.sha1(arr.tobytes()).hexdigest()[:16]
+        digest = hashlib.sha1(self._rgb_array(image)).hexdigest()[:16]
         return f"{image.width}x{image.height}:{digest}"
 
+    def _rgb_array(self, image: Image.Image) -> np.ndarray:
+        """RGB-массив (H, W, 3) только для чтения из общего кэша ядра анализа.
+
+        Тот же массив используют анализ, инспектор и метрики: на изображение одна копия.
+        """
+        return rgb_array(image)
+
     def _ensure_probe_for_export(self):
         if self.image is None or self.encoded_image is None:
             return
@@ -880,13 +993,13 @@ class MainWindow(QMainWindow):
             self.encoded_signature = "none"
             self.last_report = None
             self.last_attack_rows = []
-            self.original_view.set_pixmap(pil_to_pixmap(self.image))
+            self.original_view.set_image_async(self.image, f"image:{self.image_signature}")
             self._show_placeholder(self.modified_view, "После встраивания")
             self._set_buttons_enabled(False)
             self.robustness_bar.setValue(0)
             self.robustness_bar.setFormat("Устойчивость к атакам: —")
             self.status.setText(f"Открыто: {path}")
-            self.analysis_cache.clear()
+            self._clear_analysis_cache()
             self._reset_visual_analytics()
             self.decode_message(silent=True)
             self.update_capacity()
@@ -920,7 +1033,7 @@ class MainWindow(QMainWindow):
 
         self.encoded_image = encoded
         self.encoded_signature = self._image_signature(encoded)
-        self.modified_view.set_pixmap(pil_to_pixmap(encoded))
+        self.modified_view.set_image_async(encoded, f"image:{self.encoded_signature}")
         self._set_buttons_enabled(True)
 
         psnr_v = mse_v = ssim_v = None
@@ -929,8 +1042,8 @@ class MainWindow(QMainWindow):
         max_abs_delta = 0
         metrics_error = None
         try:
-            o = np.array(self.image)
-            e = np.array(encoded)
+            o = self._rgb_array(self.image)
+            e = self._rgb_array(encoded)
             psnr_v = float(psnr(o, e, data_range=255))
             mse_v = float(mse(o, e))
             ssim_v = float(ssim(o, e, multichannel=True, data_range=255, channel_axis=-1))
@@ -1157,7 +1270,7 @@ class MainWindow(QMainWindow):
         payload_len = len(message_text.encode("utf-8"))
         stats_orig = chi_square_lsb_test(self.image)
         best = None
-        orig_np = np.array(self.image)
+        orig_np = self._rgb_array(self.image)
 
         for method in ("sequential", "interleaved"):
             for bits in (1, 2, 3):
@@ -1166,7 +1279,7 @@ class MainWindow(QMainWindow):
                     continue
                 try:
                     encoded = encode_text_into_image(self.image, message_text, self.password.text(), bits, method)
-                    enc_np = np.array(encoded)
+                    enc_np = pil_to_np(encoded)
                     psnr_v = float(psnr(orig_np, enc_np, data_range=255))
                     ssim_v = float(ssim(orig_np, enc_np, multichannel=True, data_range=255, channel_axis=-1))
                     usage = (float(payload_len) / float(capacity)) if capacity else 1.0
@@ -1366,7 +1479,7 @@ class MainWindow(QMainWindow):
             layout.addWidget(plots)
 
             def lsb_counts(img: Image.Image):
-                arr = np.array(img.convert("RGB"), dtype=np.uint8)
+                arr = self._rgb_array(img)
                 out = []
                 for c in range(3):
                     lsb = arr[:, :, c] & 1
@@ -1414,7 +1527,7 @@ class MainWindow(QMainWindow):
             ax2 = fig.add_subplot(1, 2, 2)
 
             def draw_hist(ax, img: Image.Image, title: str):
-                arr = np.array(img.convert("RGB"), dtype=np.uint8)
+                arr = self._rgb_array(img)
                 lsb_r = (arr[:, :, 0] & 1).flatten()
                 lsb_g = (arr[:, :, 1] & 1).flatten()
                 lsb_b = (arr[:, :, 2] & 1).flatten()
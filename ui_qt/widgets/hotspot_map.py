@@ -21,7 +21,8 @@ class HotspotMapWidget(QFrame):
         self.setToolTip("Миникарта интенсивности изменений. Клик по ячейке переносит фокус в область изображения.")
 
     def set_grid(self, grid: np.ndarray, image_size: tuple[int, int]) -> None:
-        self._grid = np.array(grid, dtype=np.float32) if grid.size else np.zeros((12, 12), dtype=np.float32)
+        # Виджет сетку только читает: float32-сетка анализа берётся без копии.
+        self._grid = np.asarray(grid, dtype=np.float32) if grid.size else np.zeros((12, 12), dtype=np.float32)
         self._image_size = image_size
         self.update()
 
@@ -31,7 +32,11 @@ class HotspotMapWidget(QFrame):
         self.update()
 
     def set_selected(self, row: int, col: int) -> None:
-        self._selected = (int(row), int(col))
+        selected = (int(row), int(col))
+        # Наведение вызывает это на каждый пиксель, а тайл меняется редко.
+        if selected == self._selected:
+            return
+        self._selected = selected
         self.update()
 
     def mousePressEvent(self, event):
@@ -5,7 +5,7 @@ from typing import Any, Mapping
 import numpy as np
 from PIL import Image
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QColor, QFont, QImage, QPainter, QPixmap
+from PySide6.QtGui import QColor, QFont, QPainter, QPixmap
 from PySide6.QtWidgets import (
     QComboBox,
     QFormLayout,
@@ -16,6 +16,8 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from ui_qt.image_utils import ndarray_to_pixmap
+
 
 class PixelInspectorWidget(QFrame):
     def __init__(self, parent=None):
@@ -110,8 +112,8 @@ class PixelInspectorWidget(QFrame):
     def set_probe_data(
         self,
         probe: Mapping[str, Any],
-        original: Image.Image | None,
-        modified: Image.Image | None,
+        original: Image.Image | np.ndarray | None,
+        modified: Image.Image | np.ndarray | None,
     ) -> None:
         self.coord_label.setText(f"x={probe['x']}, y={probe['y']}")
         self.intensity_label.setText(f"{probe['intensity']}/100")
@@ -128,12 +130,19 @@ class PixelInspectorWidget(QFrame):
         if original is not None and modified is not None:
             self.magnifier.setPixmap(self._build_magnifier(original, modified, int(probe["x"]), int(probe["y"])))
 
-    def _build_magnifier(self, original: Image.Image, modified: Image.Image, x: int, y: int) -> QPixmap:
+    def _build_magnifier(
+        self,
+        original: Image.Image | np.ndarray,
+        modified: Image.Image | np.ndarray,
+        x: int,
+        y: int,
+    ) -> QPixmap:
         zoom = 12 if self.zoom_combo.currentText() == "12x" else 24
         crop_size = 11
-        orig = np.array(original.convert("RGB"), dtype=np.uint8)
-        mod = np.array(modified.convert("RGB"), dtype=np.uint8)
-        h, w = orig.shape[:2]
+        if isinstance(original, np.ndarray):
+            h, w = original.shape[:2]
+        else:
+            w, h = original.size
         x0 = max(0, x - crop_size // 2)
         x1 = min(w, x0 + crop_size)
         y0 = max(0, y - crop_size // 2)
@@ -141,32 +150,38 @@ class PixelInspectorWidget(QFrame):
         x0 = max(0, x1 - crop_size)
         y0 = max(0, y1 - crop_size)
 
-        orig_crop = orig[y0:y1, x0:x1]
-        mod_crop = mod[y0:y1, x0:x1]
+        # Конвертируется только окно 11x11 вокруг точки, а не всё изображение.
+        orig_crop = _crop_rgb(original, (x0, y0, x1, y1))
+        mod_crop = _crop_rgb(modified, (x0, y0, x1, y1))
         diff = np.abs(mod_crop.astype(np.int16) - orig_crop.astype(np.int16)).max(axis=2).astype(np.uint8)
 
-        left = Image.fromarray(orig_crop, mode="RGB").resize((orig_crop.shape[1] * zoom, orig_crop.shape[0] * zoom), Image.Resampling.NEAREST)
-        right = Image.fromarray(mod_crop, mode="RGB").resize((mod_crop.shape[1] * zoom, mod_crop.shape[0] * zoom), Image.Resampling.NEAREST)
-
-        canvas_w = left.width + right.width + 18
-        canvas_h = max(left.height, right.height) + 28
-        pix = QPixmap(canvas_w, canvas_h)
+        # Целочисленное NEAREST-увеличение — повтор строк и столбцов, без PIL.
+        left = orig_crop.repeat(zoom, axis=0).repeat(zoom, axis=1)
+        right = mod_crop.repeat(zoom, axis=0).repeat(zoom, axis=1)
+        left_w = left.shape[1]
+
+        canvas_w = left_w + right.shape[1] + 18
+        canvas_h = max(left.shape[0], right.shape[0]) + 28
+        # Холст в физических пикселях экрана: QLabel на HiDPI не растягивает его при каждой отрисовке.
+        dpr = self.magnifier.devicePixelRatioF()
+        pix = QPixmap(round(canvas_w * dpr), round(canvas_h * dpr))
+        pix.setDevicePixelRatio(dpr)
         pix.fill(QColor("#0b1f33"))
         painter = QPainter(pix)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing, False)
-        painter.drawPixmap(0, 18, _pil_to_pixmap(left))
-        painter.drawPixmap(left.width + 18, 18, _pil_to_pixmap(right))
+        painter.drawPixmap(0, 18, ndarray_to_pixmap(left))
+        painter.drawPixmap(left_w + 18, 18, ndarray_to_pixmap(right))
 
         center_x = (x - x0) * zoom + zoom // 2
         center_y = (y - y0) * zoom + zoom // 2 + 18
         painter.setPen(QColor("#ffd166"))
         painter.drawRect(center_x - zoom // 2, center_y - zoom // 2, zoom, zoom)
-        painter.drawRect(left.width + 18 + center_x - zoom // 2, center_y - zoom // 2, zoom, zoom)
+        painter.drawRect(left_w + 18 + center_x - zoom // 2, center_y - zoom // 2, zoom, zoom)
 
         painter.setPen(QColor("#dbefff"))
         painter.setFont(QFont("Segoe UI", 8))
         painter.drawText(0, 12, "До")
-        painter.drawText(left.width + 18, 12, "После")
+        painter.drawText(left_w + 18, 12, "После")
 
         if diff.size:
             painter.setPen(QColor("#45e1bc"))
@@ -175,9 +190,8 @@ class PixelInspectorWidget(QFrame):
         return pix
 
 
-def _pil_to_pixmap(image: Image.Image) -> QPixmap:
-    rgb = image.convert("RGB")
-    arr = np.array(rgb, dtype=np.uint8)
-    h, w = arr.shape[:2]
-    qimg = QImage(arr.data, w, h, arr.strides[0], QImage.Format.Format_RGB888)
-    return QPixmap.fromImage(qimg.copy())
+def _crop_rgb(source: Image.Image | np.ndarray, box: tuple[int, int, int, int]) -> np.ndarray:
+    x0, y0, x1, y1 = box
+    if isinstance(source, np.ndarray):
+        return source[y0:y1, x0:x1]
+    return np.asarray(source.crop(box).convert("RGB"), dtype=np.uint8)